@@ -0,0 +1,280 @@
+"""
+Connection pooling for the Daily Post database manager
+PostgreSQL connections are kept in a thread-safe pool bounded by min/max
+size: idle connections are health-checked before reuse and closed once they
+have sat idle too long. SQLite connections are shared through a small
+bounded queue, so a server that starts a thread per request still opens at
+most ``maxconn`` of them.
+
+Both hand out PooledConnection proxies: ``conn.close()`` (or leaving a
+``with conn:`` block) returns the connection to its pool instead of closing
+it, and a proxy that is dropped without either is released when it is
+garbage collected.
+"""
+
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the acquire timeout"""
+
+
+class PooledConnection:
+    """Proxy for a pooled DB-API connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, connection):
+        self._connection = connection
+        # Backstop for callers that lose the proxy to an exception before close()
+        self._release = weakref.finalize(self, pool.release, connection)
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise psycopg2.InterfaceError('connection already returned to the pool')
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection = None
+            self._release()  # runs pool.release once; the finalizer is then dead
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PostgresPool:
+    """Thread-safe PostgreSQL connection pool.
+
+    ``minconn`` idle connections are always kept; up to ``maxconn`` are
+    opened under load, after which callers wait up to ``acquire_timeout``
+    seconds. Connections idle for longer than ``health_check_interval`` are
+    probed with ``SELECT 1`` before being handed out, and idle connections
+    above ``minconn`` are closed after ``max_idle`` seconds.
+    """
+
+    def __init__(self, connect_kwargs, minconn=1, maxconn=10, max_idle=300,
+                 health_check_interval=30, acquire_timeout=10):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f'Invalid pool size: minconn={minconn}, maxconn={maxconn}')
+        self.connect_kwargs = connect_kwargs
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = deque()  # (connection, returned_at), most recently used last
+        self._size = 0        # open connections, idle or checked out
+        self._condition = threading.Condition()
+        self._counters = {'created': 0, 'closed': 0, 'acquired': 0, 'reused': 0,
+                          'waits': 0, 'timeouts': 0, 'health_check_failures': 0}
+
+    def _connect(self):
+        return psycopg2.connect(**self.connect_kwargs)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self._counters['closed'] += 1
+
+    def _is_healthy(self, connection, idle_for):
+        if connection.closed:
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Return a PooledConnection, opening a new connection if none is idle"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            self._reap()
+            while True:
+                # Most recently used first: it is the least likely to have gone stale
+                while self._idle:
+                    connection, returned_at = self._idle.pop()
+                    if self._is_healthy(connection, time.monotonic() - returned_at):
+                        self._counters['acquired'] += 1
+                        self._counters['reused'] += 1
+                        return PooledConnection(self, connection)
+                    self._counters['health_check_failures'] += 1
+                    self._size -= 1
+                    self._close(connection)
+
+                if self._size < self.maxconn:
+                    # Reserve the slot first so concurrent callers respect maxconn
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f'No PostgreSQL connection available after {self.acquire_timeout}s '
+                                      f'(pool max {self.maxconn})')
+                self._counters['waits'] += 1
+                self._condition.wait(remaining)
+
+        # Connect outside the lock; a slow handshake must not block releases
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters['created'] += 1
+            self._counters['acquired'] += 1
+        return PooledConnection(self, connection)
+
+    def release(self, connection):
+        """Return a connection to the pool, discarding it if it is broken"""
+        reusable = not connection.closed
+        if reusable and connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+
+        with self._condition:
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._size -= 1
+                self._close(connection)
+            self._reap()
+            self._condition.notify()
+
+    def _reap(self):
+        """Close idle connections above minconn that have been idle longer than max_idle"""
+        now = time.monotonic()
+        # The deque is ordered by return time, so the stalest connections are on the left
+        while len(self._idle) > self.minconn and now - self._idle[0][1] > self.max_idle:
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            self._close(connection)
+
+    def close_all(self):
+        """Close every idle connection (connections checked out right now are not affected)"""
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._size -= 1
+                self._close(connection)
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._counters)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min': self.minconn,
+                'max': self.maxconn,
+            })
+        return stats
+
+
+class SQLitePool:
+    """Bounded pool of SQLite connections to one database file.
+
+    Connections are shared between threads (one at a time), so the number
+    open never exceeds ``maxconn`` however many threads the server starts;
+    further callers wait up to ``acquire_timeout`` seconds.
+    """
+
+    def __init__(self, database, maxconn=5, acquire_timeout=10):
+        if maxconn < 1:
+            raise ValueError(f'Invalid pool size: maxconn={maxconn}')
+        self.database = database
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._counters = {'created': 0, 'closed': 0, 'acquired': 0, 'reused': 0, 'waits': 0, 'timeouts': 0}
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while not self._idle and self._size >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f'No SQLite connection available after {self.acquire_timeout}s '
+                                      f'(pool max {self.maxconn})')
+                self._counters['waits'] += 1
+                self._condition.wait(remaining)
+            self._counters['acquired'] += 1
+            if self._idle:
+                self._counters['reused'] += 1
+                return PooledConnection(self, self._idle.pop())
+            self._size += 1
+
+        try:
+            # check_same_thread=False: the connection moves between request threads
+            connection = sqlite3.connect(self.database, check_same_thread=False)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters['created'] += 1
+        return PooledConnection(self, connection)
+
+    def release(self, connection):
+        """Return a connection to the pool, ending any open transaction"""
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+        with self._condition:
+            if reusable and not self._closed:
+                self._idle.append(connection)
+            else:
+                self._size -= 1
+                self._counters['closed'] += 1
+                connection.close()
+            self._condition.notify()
+
+    def close_all(self):
+        """Close every connection (e.g. before the database file is removed); connections
+        checked out right now are closed when they are released"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._idle.popleft().close()
+                self._size -= 1
+                self._counters['closed'] += 1
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._counters)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max': self.maxconn,
+            })
+        return stats
@@ -4,14 +4,23 @@ Database Project Manager for Daily Post
 A comprehensive tool to manage database projects and connections
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
-import psycopg2
-import sqlite3
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, flash
+import csv
+import io
+import json
 import os
+import uuid
+import zlib
 from datetime import datetime
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
+import threading
+
+from db_pool import PostgresPool, SQLitePool
+from post_summary import summary_fields
+from images import load_renditions, store_image
+from passwords import HasherBusy, hasher_from_env
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, RequestMetrics
+from post_cache import CHANNEL as POST_CACHE_CHANNEL, pages_payload
 
 # Create a separate Flask app for database management
 db_app = Flask(__name__,
@@ -22,13 +31,24 @@ db_app = Flask(__name__,
 db_app.config['SECRET_KEY'] = secrets.token_hex(16)
 db_app.config['SESSION_PERMANENT'] = False
 
+# Request latency and template timings; queries go through DB-API pools, so no SQL counts
+metrics = RequestMetrics(prefix='dbmanager')
+metrics.init_app(db_app, sql=False)
+
+# Password hashing runs on a bounded thread pool (same PASSWORD_HASH_* settings as the app)
+password_hasher = hasher_from_env()
+
 # Default admin credentials (in production, store these securely)
 ADMIN_CREDENTIALS = {
-    'admin': generate_password_hash('admin123'),
-    'dbadmin': generate_password_hash('database2024'),
-    'manager': generate_password_hash('manager456')
+    'admin': 'admin123',
+    'dbadmin': 'database2024',
+    'manager': 'manager456'
 }
 
+# Hashes of ADMIN_CREDENTIALS, made on each account's first login rather than at startup
+_credential_hashes = {}
+_credential_hashes_lock = threading.Lock()
+
 def login_required(f):
     """Decorator to require login for protected routes"""
     from functools import wraps
@@ -39,10 +59,19 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def credential_hash(username):
+    with _credential_hashes_lock:
+        pwhash = _credential_hashes.get(username)
+    if pwhash is None:
+        pwhash = password_hasher.hash(ADMIN_CREDENTIALS[username])
+        with _credential_hashes_lock:
+            pwhash = _credential_hashes.setdefault(username, pwhash)
+    return pwhash
+
 def authenticate_user(username, password):
     """Authenticate user credentials"""
     if username in ADMIN_CREDENTIALS:
-        return check_password_hash(ADMIN_CREDENTIALS[username], password)
+        return password_hasher.verify(credential_hash(username), password)
     return False
 
 # File upload configuration
@@ -56,6 +85,76 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def touch_clause(db_type):
+    """SET fragment bumping updated_at so the app's ETags change (legacy SQLite has no such column)"""
+    return ", updated_at = NOW()" if db_type == 'postgresql' else ""
+
+def enqueue_job(kind, payload):
+    """Queue a background job for the app's job workers (see jobs.py); returns the job id"""
+    conn = db_manager.get_postgresql_connection()
+    if not conn:
+        raise RuntimeError('Could not connect to postgresql database')
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO job (kind, status, payload, attempts, created_at) "
+            "VALUES (%s, 'queued', %s, 0, NOW()) RETURNING id;",
+            (kind, json.dumps(payload))
+        )
+        job_id = cursor.fetchone()[0]
+        conn.commit()
+        cursor.close()
+    return job_id
+
+def notify_post_cache(payload, page_tags='*'):
+    """Make the app's workers drop cached posts (see post_cache.py): a post id, or '*' for all;
+    and the cached pages carrying ``page_tags`` (see page_cache.py), by default all of them"""
+    conn = db_manager.get_postgresql_connection()
+    if not conn:
+        return
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_notify(%s, %s);", (POST_CACHE_CHANNEL, str(payload)))
+        cursor.execute("SELECT pg_notify(%s, %s);", (POST_CACHE_CHANNEL, pages_payload(page_tags)))
+        conn.commit()
+        cursor.close()
+
+def post_page_tags(post_id):
+    """Page cache tags showing a post: the homepage, the post and its current category"""
+    tags = ['index', f'post:{post_id}']
+    conn = db_manager.get_postgresql_connection()
+    if not conn:
+        return '*'
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT category FROM post WHERE id = %s;", (post_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    if row and row[0]:
+        tags.append(f'category:{row[0]}')
+    return tags
+
+def derived_values(db_type, content, image_url):
+    """SQL literals for the columns the app derives from content and image_url (legacy SQLite has none of them)"""
+    if db_type != 'postgresql':
+        return {}
+    fields = summary_fields(content)
+    renditions = load_renditions(image_url, db_app.config['UPLOAD_FOLDER'])
+    return {
+        'excerpt': "'" + fields['excerpt'].replace("'", "''") + "'",
+        'word_count': str(fields['word_count']),
+        'reading_time': str(fields['reading_time']),
+        'image_renditions': "'" + json.dumps(renditions).replace("'", "''") + "'" if renditions else 'NULL'
+    }
+
 class DatabaseManager:
     def __init__(self):
         self.connections = {
@@ -70,30 +169,64 @@ class DatabaseManager:
                 'database': '../backend/instance/news.db'
             }
         }
-    
+        # Connection pool settings (PostgreSQL); idle times are in seconds
+        self.pool_settings = {
+            'minconn': int(os.environ.get('DB_POOL_MIN', 1)),
+            'maxconn': int(os.environ.get('DB_POOL_MAX', 10)),
+            'max_idle': int(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+            'health_check_interval': int(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+            'acquire_timeout': int(os.environ.get('DB_POOL_ACQUIRE_TIMEOUT', 10)),
+        }
+        self.pools = {}
+        self._pools_lock = threading.Lock()
+
+    def get_pool(self, db_type):
+        """Return the connection pool for ``db_type``, creating it on first use"""
+        with self._pools_lock:
+            if db_type not in self.pools:
+                if db_type == 'postgresql':
+                    config = self.connections['postgresql']
+                    self.pools[db_type] = PostgresPool({
+                        'host': config['host'],
+                        'port': config['port'],
+                        'database': config['database'],
+                        'user': config['user'],
+                        'password': config['password']
+                    }, **self.pool_settings)
+                elif db_type == 'sqlite':
+                    self.pools[db_type] = SQLitePool(self.connections['sqlite']['database'],
+                                                     maxconn=int(os.environ.get('SQLITE_POOL_SIZE', 5)),
+                                                     acquire_timeout=self.pool_settings['acquire_timeout'])
+                else:
+                    raise ValueError(f'Invalid database type: {db_type}')
+            return self.pools[db_type]
+
+    def close_pool(self, db_type):
+        """Close a pool's connections, e.g. before its database file is removed"""
+        with self._pools_lock:
+            pool = self.pools.pop(db_type, None)
+        if pool:
+            pool.close_all()
+
+    def pool_stats(self):
+        with self._pools_lock:
+            pools = dict(self.pools)
+        return {db_type: pool.stats() for db_type, pool in pools.items()}
+
     def get_postgresql_connection(self):
-        """Get PostgreSQL connection"""
+        """Get a pooled PostgreSQL connection; close() returns it to the pool"""
         try:
-            config = self.connections['postgresql']
-            conn = psycopg2.connect(
-                host=config['host'],
-                port=config['port'],
-                database=config['database'],
-                user=config['user'],
-                password=config['password']
-            )
-            return conn
+            return self.get_pool('postgresql').acquire()
         except Exception as e:
             print(f"PostgreSQL connection failed: {e}")
             return None
     
     def get_sqlite_connection(self):
-        """Get SQLite connection"""
+        """Get a pooled SQLite connection; close() returns it to the pool"""
         try:
             db_path = self.connections['sqlite']['database']
             if os.path.exists(db_path):
-                conn = sqlite3.connect(db_path)
-                return conn
+                return self.get_pool('sqlite').acquire()
             else:
                 print(f"SQLite database not found: {db_path}")
                 return None
@@ -101,6 +234,35 @@ class DatabaseManager:
             print(f"SQLite connection failed: {e}")
             return None
     
+    def stream_query(self, db_type, query, batch_size=EXPORT_BATCH_SIZE):
+        """Run a SELECT and return a QueryStream over its rows in batches.
+
+        PostgreSQL uses a server-side (named) cursor so rows are fetched
+        ``batch_size`` at a time; SQLite steps its cursor the same way.
+        Raises ConnectionError if the database is unavailable.
+        """
+        if db_type == 'postgresql':
+            conn = self.get_postgresql_connection()
+        elif db_type == 'sqlite':
+            conn = self.get_sqlite_connection()
+        else:
+            raise ValueError(f'Invalid database type: {db_type}')
+
+        if not conn:
+            raise ConnectionError(f'Could not connect to {db_type} database')
+
+        try:
+            if db_type == 'postgresql':
+                cursor = conn.cursor(name=f'export_{uuid.uuid4().hex}')
+                cursor.itersize = batch_size
+            else:
+                cursor = conn.cursor()
+            cursor.execute(query)
+            return QueryStream(conn, cursor, batch_size)
+        except Exception:
+            conn.close()
+            raise
+
     def execute_query(self, db_type, query):
         """Execute a query on the specified database"""
         try:
@@ -114,23 +276,24 @@ class DatabaseManager:
             if not conn:
                 return {'error': f'Could not connect to {db_type} database'}
             
-            cursor = conn.cursor()
-            cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                result = {
-                    'columns': columns,
-                    'rows': rows,
-                    'count': len(rows)
-                }
-            else:
-                conn.commit()
-                result = {'message': 'Query executed successfully', 'rowcount': cursor.rowcount}
-            
-            cursor.close()
-            conn.close()
+            # Closing hands the connection back to the pool, which rolls back a failed query
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+
+                if query.strip().upper().startswith('SELECT'):
+                    columns = [desc[0] for desc in cursor.description]
+                    rows = cursor.fetchall()
+                    result = {
+                        'columns': columns,
+                        'rows': rows,
+                        'count': len(rows)
+                    }
+                else:
+                    conn.commit()
+                    result = {'message': 'Query executed successfully', 'rowcount': cursor.rowcount}
+
+                cursor.close()
             return result
             
         except Exception as e:
@@ -152,19 +315,19 @@ class DatabaseManager:
                 if not conn:
                     return {'error': 'Could not connect to SQLite database'}
                 
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = cursor.fetchall()
-                
-                table_info = {}
-                for table in tables:
-                    table_name = table[0]
-                    cursor.execute(f"PRAGMA table_info({table_name});")
-                    columns = cursor.fetchall()
-                    table_info[table_name] = columns
-                
-                cursor.close()
-                conn.close()
+                with conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+                    tables = cursor.fetchall()
+
+                    table_info = {}
+                    for table in tables:
+                        table_name = table[0]
+                        cursor.execute(f"PRAGMA table_info({table_name});")
+                        columns = cursor.fetchall()
+                        table_info[table_name] = columns
+
+                    cursor.close()
                 return {'tables': table_info}
             
             result = self.execute_query(db_type, query)
@@ -173,6 +336,71 @@ class DatabaseManager:
         except Exception as e:
             return {'error': str(e)}
 
+class QueryStream:
+    """Batches of rows from an open cursor; the connection is released when exhausted or closed"""
+
+    def __init__(self, conn, cursor, batch_size):
+        self.conn = conn
+        self.cursor = cursor
+        self.batch_size = batch_size
+        # A named cursor only has a description after its first fetch
+        self._first_batch = cursor.fetchmany(batch_size)
+        self.columns = [desc[0] for desc in cursor.description]
+
+    def __iter__(self):
+        try:
+            batch = self._first_batch
+            while batch:
+                yield batch
+                batch = self.cursor.fetchmany(self.batch_size)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.conn is not None:
+            conn, self.conn = self.conn, None
+            try:
+                self.cursor.close()
+            finally:
+                conn.close()
+
+
+def export_value(value):
+    """JSON-safe form of a database value"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+def encode_ndjson(stream):
+    for batch in stream:
+        yield ''.join(
+            json.dumps(dict(zip(stream.columns, map(export_value, row))), default=str) + '\n'
+            for row in batch
+        ).encode('utf-8')
+
+def encode_csv(stream):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(stream.columns)
+    for batch in stream:
+        writer.writerows([export_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def gzip_chunks(chunks):
+    """Gzip a byte stream incrementally, flushing each chunk so the client gets it right away"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
 # Initialize database manager
 db_manager = DatabaseManager()
 
@@ -183,7 +411,13 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
 
-        if authenticate_user(username, password):
+        try:
+            authenticated = authenticate_user(username, password)
+        except HasherBusy:
+            flash('Too many sign-ins right now. Please try again in a moment.', 'error')
+            return render_template('login.html'), 503
+
+        if authenticated:
             session['logged_in'] = True
             session['username'] = username
             flash('Login successful!', 'success')
@@ -213,11 +447,11 @@ def connect_db(db_type):
     if db_type == 'postgresql':
         conn = db_manager.get_postgresql_connection()
         if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT version();")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT version();")
+                version = cursor.fetchone()[0]
+                cursor.close()
             return jsonify({'status': 'success', 'message': f'Connected to PostgreSQL', 'version': version})
         else:
             return jsonify({'status': 'error', 'message': 'Failed to connect to PostgreSQL'})
@@ -225,11 +459,11 @@ def connect_db(db_type):
     elif db_type == 'sqlite':
         conn = db_manager.get_sqlite_connection()
         if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT sqlite_version();")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT sqlite_version();")
+                version = cursor.fetchone()[0]
+                cursor.close()
             return jsonify({'status': 'success', 'message': f'Connected to SQLite', 'version': version})
         else:
             return jsonify({'status': 'error', 'message': 'Failed to connect to SQLite'})
@@ -250,6 +484,18 @@ def execute_query():
     result = db_manager.execute_query(db_type, query)
     return jsonify(result)
 
+@db_app.route('/pool_stats')
+@login_required
+def pool_stats():
+    """Connection pool statistics for each database opened so far"""
+    return jsonify(db_manager.pool_stats())
+
+@db_app.route('/metrics')
+@login_required
+def request_metrics():
+    """Request metrics in the Prometheus text format"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
 @db_app.route('/tables/<db_type>')
 def get_tables(db_type):
     """Get table information"""
@@ -258,7 +504,16 @@ def get_tables(db_type):
 
 @db_app.route('/export/<db_type>')
 def export_data(db_type):
-    """Export database data"""
+    """Export database data.
+
+    ``?format=ndjson`` or ``?format=csv`` streams the post table in batches
+    (add ``&gzip=1`` for a compressed download); without a format the whole
+    table is returned as a single JSON document.
+    """
+    export_format = request.args.get('format')
+    if export_format:
+        return stream_export(db_type, export_format, request.args.get('gzip') in ('1', 'true'))
+
     try:
         if db_type == 'postgresql':
             # Export PostgreSQL data
@@ -286,6 +541,33 @@ def export_data(db_type):
     except Exception as e:
         return jsonify({'error': str(e)})
 
+def stream_export(db_type, export_format, compress):
+    """Chunked download of the post table as NDJSON or CSV"""
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+    if db_type not in ('postgresql', 'sqlite'):
+        return jsonify({'error': 'Invalid database type'}), 400
+
+    try:
+        stream = db_manager.stream_query(db_type, "SELECT * FROM post ORDER BY id;")
+    except Exception as e:
+        return jsonify({'error': str(e)}), 503
+
+    encode = encode_ndjson if export_format == 'ndjson' else encode_csv
+    body = encode(stream)
+    filename = f"{db_type}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    mimetype = EXPORT_FORMATS[export_format]
+    if compress:
+        body = gzip_chunks(body)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Release the connection even if the client disconnects before the first chunk
+    response.call_on_close(stream.close)
+    return response
+
 @db_app.route('/posts/<db_type>')
 def get_posts(db_type):
     """Get all posts for management"""
@@ -319,6 +601,8 @@ def update_post():
         category = data.get('category', '')
         featured = data.get('featured', False)
         image_url = data.get('image_url', '').replace("'", "''")
+        derived = ''.join(f", {column} = {value}" for column, value in
+                          derived_values(db_type, data.get('content', ''), data.get('image_url', '')).items())
 
         query = f"""
         UPDATE post SET
@@ -327,11 +611,17 @@ def update_post():
             author = '{author}',
             category = '{category}',
             featured = {featured},
-            image_url = '{image_url}'
+            image_url = '{image_url}'{derived}{touch_clause(db_type)}
         WHERE id = {post_id};
         """
 
+        # Pages of the category the post leaves as well as the one it joins
+        page_tags = post_page_tags(int(post_id)) if db_type == 'postgresql' else None
         result = db_manager.execute_query(db_type, query)
+        if db_type == 'postgresql' and 'error' not in result:
+            if page_tags != '*' and category:
+                page_tags.append(f'category:{category}')
+            notify_post_cache(int(post_id), page_tags)
         return jsonify(result)
 
     except Exception as e:
@@ -346,7 +636,10 @@ def delete_post():
         post_id = data.get('id')
 
         query = f"DELETE FROM post WHERE id = {post_id};"
+        page_tags = post_page_tags(int(post_id)) if db_type == 'postgresql' else None
         result = db_manager.execute_query(db_type, query)
+        if db_type == 'postgresql' and 'error' not in result:
+            notify_post_cache(int(post_id), page_tags)
         return jsonify(result)
 
     except Exception as e:
@@ -383,8 +676,15 @@ def update_category():
         if old_category == new_category:
             return jsonify({'error': 'New category name must be different from the old one'})
 
+        if db_type == 'postgresql':
+            # A big category can take a while to rewrite; the app's job workers do it
+            job_id = enqueue_job('rename_category', {'old_category': data['old_category'],
+                                                     'new_category': data['new_category']})
+            return jsonify({'message': 'Category rename queued', 'job_id': job_id,
+                            'status_url': url_for('job_status', job_id=job_id)}), 202
+
         query = f"""
-        UPDATE post SET category = '{new_category}'
+        UPDATE post SET category = '{new_category}'{touch_clause(db_type)}
         WHERE category = '{old_category}';
         """
 
@@ -394,6 +694,19 @@ def update_category():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@db_app.route('/jobs/<int:job_id>')
+def job_status(job_id):
+    """Status of a background job queued on the PostgreSQL database"""
+    result = db_manager.execute_query(
+        'postgresql', f"SELECT id, kind, status, result, error, created_at, finished_at FROM job WHERE id = {job_id};")
+    if 'error' in result:
+        return jsonify(result), 500
+    if not result['rows']:
+        return jsonify({'error': 'Job not found'}), 404
+    job = dict(zip(result['columns'], result['rows'][0]))
+    job['finished'] = job['status'] in ('succeeded', 'failed')
+    return jsonify(job)
+
 @db_app.route('/delete_category', methods=['POST'])
 def delete_category():
     """Delete a category and handle posts"""
@@ -411,9 +724,11 @@ def delete_category():
             query = f"DELETE FROM post WHERE category = '{category}';"
         else:
             # Move posts to 'General' category
-            query = f"UPDATE post SET category = 'General' WHERE category = '{category}';"
+            query = f"UPDATE post SET category = 'General'{touch_clause(db_type)} WHERE category = '{category}';"
 
         result = db_manager.execute_query(db_type, query)
+        if db_type == 'postgresql' and 'error' not in result:
+            notify_post_cache('*')
         return jsonify(result)
 
     except Exception as e:
@@ -437,7 +752,8 @@ def delete_database():
         if not os.path.exists(sqlite_path):
             return jsonify({'error': 'SQLite database file not found'})
 
-        # Delete the database file
+        # Close the pooled connections before deleting the file under them
+        db_manager.close_pool('sqlite')
         os.remove(sqlite_path)
 
         return jsonify({
@@ -501,20 +817,12 @@ def upload_image():
             return jsonify({'error': 'No file selected'})
 
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            # Add timestamp to avoid filename conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-            filename = timestamp + filename
-
-            # Create upload directory if it doesn't exist
-            os.makedirs(db_app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-            file_path = os.path.join(db_app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-
-            # Return the URL path for the uploaded image
-            image_url = f'/static/images/{filename}'
-            return jsonify({'success': True, 'image_url': image_url, 'filename': filename})
+            # Stored under its content hash (an identical earlier upload is reused) with
+            # resized renditions, which create_post/update_post pick up via the image URL
+            image_url = store_image(file, db_app.config['UPLOAD_FOLDER'])
+            renditions = load_renditions(image_url, db_app.config['UPLOAD_FOLDER'])
+            return jsonify({'success': True, 'image_url': image_url, 'filename': image_url.rsplit('/', 1)[1],
+                            'renditions': renditions})
         else:
             return jsonify({'error': 'Invalid file type. Please upload PNG, JPG, JPEG, GIF, or WEBP files.'})
 
@@ -535,9 +843,10 @@ def create_post():
         image_url = data.get('image_url', '').replace("'", "''")
 
         if db_type == 'postgresql':
+            derived = derived_values(db_type, data.get('content', ''), data.get('image_url', ''))
             query = f"""
-            INSERT INTO post (title, content, author, category, featured, image_url, date_posted)
-            VALUES ('{title}', '{content}', '{author}', '{category}', {featured}, '{image_url}', NOW());
+            INSERT INTO post (title, content, author, category, featured, image_url, date_posted, {', '.join(derived)})
+            VALUES ('{title}', '{content}', '{author}', '{category}', {featured}, '{image_url}', NOW(), {', '.join(derived.values())});
             """
         else:
             query = f"""
@@ -766,6 +1075,23 @@ def create_db_templates():
             </div>
         </div>
 
+        <!-- Connection Pool Statistics -->
+        <div class="row mt-4">
+            <div class="col-12">
+                <div class="card">
+                    <div class="card-header d-flex justify-content-between align-items-center">
+                        <h5><i class="fas fa-network-wired me-2"></i>Connection Pools</h5>
+                        <button type="button" class="btn btn-outline-secondary btn-sm" onclick="loadPoolStats()">
+                            <i class="fas fa-sync me-2"></i>Refresh
+                        </button>
+                    </div>
+                    <div class="card-body">
+                        <div id="poolStats"><small class="text-muted">No connections opened yet.</small></div>
+                    </div>
+                </div>
+            </div>
+        </div>
+
         <!-- Post Management Section -->
         <div class="row mt-4 hidden" id="postManagement">
             <div class="col-12">
@@ -1108,9 +1434,37 @@ def create_db_templates():
                     } else {
                         statusDiv.innerHTML = `<small class="status-error"><i class="fas fa-times-circle"></i> ${data.message}</small>`;
                     }
+                    loadPoolStats();
+                });
+        }
+
+        function loadPoolStats() {
+            fetch('/pool_stats')
+                .then(response => response.json())
+                .then(data => {
+                    const pools = Object.keys(data);
+                    if (pools.length === 0) {
+                        document.getElementById('poolStats').innerHTML =
+                            '<small class="text-muted">No connections opened yet.</small>';
+                        return;
+                    }
+                    const fields = ['size', 'in_use', 'idle', 'min', 'max', 'created', 'reused', 'closed',
+                                    'waits', 'timeouts', 'health_check_failures'];
+                    let html = '<table class="table table-sm mb-0"><thead><tr><th>Database</th>';
+                    fields.forEach(field => html += `<th>${field.replace(/_/g, ' ')}</th>`);
+                    html += '</tr></thead><tbody>';
+                    pools.forEach(pool => {
+                        html += `<tr><td>${pool}</td>`;
+                        fields.forEach(field => html += `<td>${data[pool][field] ?? '-'}</td>`);
+                        html += '</tr>';
+                    });
+                    html += '</tbody></table>';
+                    document.getElementById('poolStats').innerHTML = html;
                 });
         }
 
+        document.addEventListener('DOMContentLoaded', loadPoolStats);
+
         function executeQuery() {
             const dbType = document.getElementById('queryDbType').value;
             const query = document.getElementById('queryText').value;
@@ -1159,20 +1513,8 @@ def create_db_templates():
         }
 
         function exportData(dbType) {
-            fetch(`/export/${dbType}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.error) {
-                        alert(`Export failed: ${data.error}`);
-                    } else {
-                        const blob = new Blob([JSON.stringify(data, null, 2)], {type: 'application/json'});
-                        const url = URL.createObjectURL(blob);
-                        const a = document.createElement('a');
-                        a.href = url;
-                        a.download = `${dbType}_export_${new Date().toISOString().split('T')[0]}.json`;
-                        a.click();
-                    }
-                });
+            // Streamed straight to disk by the browser, so large tables never sit in memory
+            window.location.href = `/export/${dbType}?format=ndjson`;
         }
 
         // Post Management Functions
@@ -1287,6 +1629,7 @@ def create_db_templates():
                 body: JSON.stringify(categoryData)
             })
             .then(response => response.json())
+            .then(data => data.status_url ? waitForJob(data.status_url) : data)
             .then(data => {
                 if (data.error) {
                     alert(`Update failed: ${data.error}`);
@@ -1298,6 +1641,17 @@ def create_db_templates():
             });
         }
 
+        function waitForJob(statusUrl, interval = 1000) {
+            // Resolves with the finished job; a failed job carries its error
+            return fetch(statusUrl)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.error || job.finished) return job;
+                    return new Promise(resolve => setTimeout(resolve, interval))
+                        .then(() => waitForJob(statusUrl, interval));
+                });
+        }
+
         function confirmDeleteCategory(categoryName, dbType) {
             document.getElementById('deleteCategoryDbType').value = dbType;
             document.getElementById('deleteCategoryName').value = categoryName;
@@ -1544,6 +1898,7 @@ def create_db_templates():
                             // Update the status to show database is deleted
                             document.getElementById('sqlite-status').innerHTML =
                                 '<small class="status-error"><i class="fas fa-times-circle"></i> Database deleted</small>';
+                            loadPoolStats();
                         }
                     })
                     .catch(error => {
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Query Plan Report for Daily Post
+Prints EXPLAIN ANALYZE for the query behind each public route, optionally
+seeding a synthetic corpus first and comparing plans with and without the
+Post read-path indexes.
+
+Usage:
+    python explain_routes.py                  # plans with the current indexes
+    python explain_routes.py --before         # plans with the indexes dropped (rolled back afterwards)
+    python explain_routes.py --seed 1000000   # add 1M synthetic posts, ANALYZE, then report
+"""
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+
+from app import app, db, Post
+from post_summary import summarize
+from search import ranked_search_query
+
+POST_INDEXES = [
+    'ix_post_date_posted_id',
+    'ix_post_featured_date_posted_id',
+    'ix_post_category_date_posted_id',
+    'ix_post_author',
+    'ix_post_search_vector',
+]
+
+SEED_CATEGORIES = ['General', 'Technology', 'Sports', 'Business', 'Entertainment',
+                   'Science', 'Politics', 'Travel', 'Food']
+SEED_AUTHORS = 200
+
+
+def route_queries():
+    """The statements issued by each read route, keyed by a descriptive label"""
+    per_page = app.config['POSTS_PER_PAGE']
+    newest_first = (Post.date_posted.desc(), Post.id.desc())
+    summaries = summarize(Post.query, Post)
+
+    # A cursor roughly in the middle of the table, as a deep page would use
+    middle = db.session.query(Post.date_posted, Post.id) \
+        .order_by(*newest_first).offset(Post.query.count() // 2).limit(1).first()
+    cursor_key = (middle.date_posted, middle.id) if middle else (datetime.now(), 0)
+
+    api_page = db.session.query(Post.id, Post.date_posted, Post.updated_at) \
+        .order_by(*newest_first).limit(app.config['API_PAGE_SIZE'] + 1)
+    api_page_ids = [row.id for row in api_page.limit(app.config['API_PAGE_SIZE'])] or [0]
+
+    queries = {
+        'index (first page)': summaries.order_by(*newest_first).limit(per_page + 1),
+        'index (deep page)': summaries
+            .filter(db.tuple_(Post.date_posted, Post.id) < cursor_key)
+            .order_by(*newest_first).limit(per_page + 1),
+        'index (featured strip)': summaries.filter_by(featured=True)
+            .order_by(Post.date_posted.desc()).limit(app.config['FEATURED_POSTS_LIMIT']),
+        'category': summaries.filter_by(category='Technology')
+            .order_by(*newest_first).limit(per_page + 1),
+        # /api/posts pages through metadata, then loads that page's summaries by id
+        'api_posts (metadata page)': api_page,
+        'api_posts (page posts)': summaries.filter(Post.id.in_(api_page_ids)),
+        'author filter': Post.query.filter_by(author='Author 7')
+            .order_by(Post.date_posted.desc()),
+    }
+
+    if db.engine.dialect.name == 'postgresql':
+        search_query, rank = ranked_search_query(db.session, Post, 'lorem ipsum')
+        queries['search'] = search_query.order_by(rank.desc(), Post.id.desc()).limit(per_page + 1)
+
+    return queries
+
+
+def explain(connection, query):
+    """Return the plan lines for a Query using the dialect's EXPLAIN"""
+    # render_postcompile expands IN (...) lists into one parameter per value
+    compiled = query.statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    if connection.dialect.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    if connection.dialect.name == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    else:
+        prefix = 'EXPLAIN QUERY PLAN '
+
+    rows = connection.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return [' | '.join(str(col) for col in row) for row in rows]
+
+
+def print_report(connection, label, queries):
+    print("\n" + "=" * 70)
+    print(f"📊 QUERY PLANS ({label})")
+    print("=" * 70)
+
+    for route, query in queries.items():
+        plan = explain(connection, query)
+        seq_scan = any('Seq Scan on post' in line or line.endswith('SCAN post') for line in plan)
+        marker = '⚠️ sequential scan' if seq_scan else '✅ index scan'
+        print(f"\n▶ {route}  [{marker}]")
+        for line in plan:
+            print(f"    {line}")
+
+
+def seed_posts(count):
+    """Insert ``count`` synthetic posts spread over ten years"""
+    print(f"🌱 Seeding {count} synthetic posts...")
+    engine = db.engine
+
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as connection:
+            connection.execute(db.text("""
+                INSERT INTO post (title, content, author, date_posted, category, featured, image_url)
+                SELECT 'Synthetic post ' || g,
+                       repeat('Lorem ipsum dolor sit amet ' || g || '. ', 40),
+                       'Author ' || (g % :authors),
+                       now() - (random() * interval '3650 days'),
+                       (:categories)[1 + (g % :category_count)],
+                       random() < 0.02,
+                       NULL
+                FROM generate_series(1, :count) AS g
+            """), {'authors': SEED_AUTHORS, 'categories': SEED_CATEGORIES,
+                   'category_count': len(SEED_CATEGORIES), 'count': count})
+            connection.execute(db.text("ANALYZE post"))
+    else:
+        now = datetime.now()
+        batch = []
+        for i in range(count):
+            batch.append({
+                'title': f'Synthetic post {i}',
+                'content': f'Lorem ipsum dolor sit amet {i}. ' * 40,
+                'author': f'Author {i % SEED_AUTHORS}',
+                'date_posted': now - timedelta(seconds=random.randint(0, 3650 * 86400)),
+                'category': SEED_CATEGORIES[i % len(SEED_CATEGORIES)],
+                'featured': random.random() < 0.02,
+                'image_url': None,
+            })
+            if len(batch) == 10000 or i == count - 1:
+                with engine.begin() as connection:
+                    connection.execute(Post.__table__.insert(), batch)
+                batch = []
+        with engine.begin() as connection:
+            connection.execute(db.text("ANALYZE"))
+
+    print("✅ Seeding complete")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=0, help='insert N synthetic posts before reporting')
+    parser.add_argument('--before', action='store_true',
+                        help='also report plans with the Post indexes dropped (inside a rolled-back transaction)')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.seed:
+            seed_posts(args.seed)
+
+        print(f"📋 Posts in table: {Post.query.count()}")
+        # Built up front: the --before transaction locks the post table
+        queries = route_queries()
+
+        if args.before and db.engine.dialect.name != 'postgresql':
+            print("⚠️ --before needs PostgreSQL (transactional DDL); skipping the comparison")
+        elif args.before:
+            # DDL is transactional, so the indexes come back on rollback
+            with db.engine.connect() as connection:
+                transaction = connection.begin()
+                try:
+                    for name in POST_INDEXES:
+                        connection.execute(db.text(f"DROP INDEX IF EXISTS {name}"))
+                    print_report(connection, 'before: without Post indexes', queries)
+                finally:
+                    transaction.rollback()
+
+        with db.engine.connect() as connection:
+            print_report(connection, 'after: with Post indexes', queries)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
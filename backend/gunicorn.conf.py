@@ -0,0 +1,97 @@
+"""
+Gunicorn configuration for Daily Post
+Gunicorn reads this file automatically when started from backend/. Pick a
+worker profile with GUNICORN_PROFILE:
+
+    sync     one request at a time per process (gunicorn's default); 2 x cores + 1 processes
+    gthread  a process per core, each serving GUNICORN_THREADS requests on threads
+    gevent   a process per core, each serving up to GUNICORN_WORKER_CONNECTIONS
+             requests on greenlets; psycopg2 is made cooperative with psycogreen
+             (pip install gevent psycogreen)
+
+WEB_CONCURRENCY, GUNICORN_THREADS and GUNICORN_WORKER_CONNECTIONS override the
+profile's sizes; compare_servers.py measures the profiles against each other.
+
+GUNICORN_PRELOAD=true imports the app once in the master so workers fork with
+it loaded (faster boots, shared memory). The engine's pool is replaced in each
+worker after the fork, so no connection is ever shared between processes.
+"""
+
+import multiprocessing
+import os
+
+CORES = multiprocessing.cpu_count()
+
+PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'workers': CORES * 2 + 1,
+        'threads': 1,
+        'db_pool_size': 1,
+    },
+    'gthread': {
+        'worker_class': 'gthread',
+        'workers': CORES,
+        'threads': 8,
+        'db_pool_size': 8,
+    },
+    'gevent': {
+        'worker_class': 'gevent',
+        'workers': CORES,
+        'worker_connections': 200,
+        'db_pool_size': 20,
+        # Modules the app imports before gevent patches them would keep blocking locks
+        'preload_app': False,
+    },
+}
+
+profile_name = os.environ.get('GUNICORN_PROFILE', 'sync')
+if profile_name not in PROFILES:
+    raise RuntimeError(f"Unknown GUNICORN_PROFILE {profile_name!r}; choose one of {', '.join(PROFILES)}")
+profile = PROFILES[profile_name]
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+worker_class = profile['worker_class']
+workers = int(os.environ.get('WEB_CONCURRENCY', profile['workers']))
+threads = int(os.environ.get('GUNICORN_THREADS', profile.get('threads', 1)))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', profile.get('worker_connections', 1000)))
+preload_app = os.environ.get('GUNICORN_PRELOAD', str(profile.get('preload_app', True))).lower() == 'true'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot accumulate; jitter avoids all restarting at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # e.g. '-' for stdout
+errorlog = '-'
+
+# One pooled connection per request a worker can serve at once (read by app.py)
+concurrency = threads if worker_class == 'gthread' else 1
+os.environ.setdefault('DB_POOL_SIZE', str(profile['db_pool_size'] if worker_class == 'gevent' else concurrency))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(profile['db_pool_size'] if worker_class == 'gevent' else 2))
+
+
+def post_fork(server, worker):
+    """Give each worker its own connection pool when the app was preloaded in the master"""
+    import sys
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        with app_module.app.app_context():
+            # close=False leaves the master's connections (if any) to the master
+            app_module.db.engine.dispose(close=False)
+            app_module.replicas.dispose(close=False)
+
+
+def post_worker_init(worker):
+    if worker_class == 'gevent':
+        # Let psycopg2 yield to other greenlets while it waits on the database
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+def when_ready(server):
+    server.log.info(f"Daily Post: {profile_name} profile, {workers} worker(s) x "
+                    f"{worker_connections if worker_class == 'gevent' else threads} concurrent request(s), "
+                    f"preload_app={preload_app}")
@@ -0,0 +1,217 @@
+"""
+Image storage and renditions for Daily Post uploads
+Uploads are stored by the SHA-256 of their bytes in sharded directories
+(``ab/cd/abcd....jpg``), so the same image uploaded twice is stored once and
+every URL names exactly one immutable file -- safe to cache forever.
+
+Each stored image is also resized to a few standard widths (thumb, card,
+full), saved in its original format and as WebP next to the original. The
+dimensions and URLs are written to a small JSON manifest beside the upload
+(``<filename>.json``) so anything that knows an image URL -- the app's
+Post model or the database manager's raw SQL -- can look its renditions up,
+and templates can emit srcset/width/height instead of the full original.
+
+Pillow is optional: without it uploads are stored as-is and pages fall back
+to the original image. It is imported on first use, so only requests that
+process an upload pay for loading it.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import uuid
+
+IMAGE_URL_PREFIX = '/static/images'
+
+# (name, maximum width in pixels), smallest first
+RENDITIONS = (
+    ('thumb', 320),
+    ('card', 640),
+    ('full', 1280),
+)
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+# Extensions that name the same format are stored under one spelling
+_EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+# Path (relative to the static folder) of a content-addressed upload or one of its renditions
+_CONTENT_ADDRESSED_PATH = re.compile(r'^images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[.-]')
+
+# Formats Pillow writes for the "original format" copy of a rendition
+_SAVE_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG', 'GIF': 'GIF', 'WEBP': 'WEBP'}
+
+
+def _manifest_path(image_path):
+    return image_path + '.json'
+
+
+def _temporary_path(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f'.{filename}.{uuid.uuid4().hex}.tmp')
+
+
+def _save(image, path, image_format):
+    """Write ``image`` to ``path`` atomically, so a file at its final name is always complete"""
+    temporary = _temporary_path(path)
+    try:
+        _write(image, temporary, image_format)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def _write(image, path, image_format):
+    if image_format == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        image.save(path, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(path, image_format, optimize=True)
+
+
+def content_path(digest, extension):
+    """Sharded relative path for a file with the given SHA-256 hex digest"""
+    return posixpath.join(digest[:2], digest[2:4], f'{digest}.{extension}')
+
+
+def store_image(file, upload_folder, url_prefix=IMAGE_URL_PREFIX, renditions=True):
+    """Store an uploaded file under its content hash and (unless ``renditions`` is False) create its renditions.
+
+    ``file`` is a werkzeug FileStorage whose filename has an allowed image
+    extension. Returns the image URL; uploading bytes that are already stored
+    returns the existing URL without writing anything.
+    """
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    extension = _EXTENSION_ALIASES.get(extension, extension)
+
+    os.makedirs(upload_folder, exist_ok=True)
+    temporary = _temporary_path(os.path.join(upload_folder, 'upload'))
+    digest = hashlib.sha256()
+    try:
+        with open(temporary, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(64 * 1024), b''):
+                digest.update(chunk)
+                out.write(chunk)
+
+        relative = content_path(digest.hexdigest(), extension)
+        path = os.path.join(upload_folder, *relative.split('/'))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    if renditions and not os.path.exists(_manifest_path(path)):
+        create_renditions(path, posixpath.dirname(f'{url_prefix}/{relative}'))
+    return f'{url_prefix}/{relative}'
+
+
+def is_immutable_path(static_path):
+    """Whether a path under the static folder names a content-addressed image"""
+    return bool(_CONTENT_ADDRESSED_PATH.match(static_path))
+
+
+def create_renditions(image_path, url_prefix=IMAGE_URL_PREFIX):
+    """Write the renditions and manifest for the image at ``image_path``.
+
+    Returns the manifest dict, or None when Pillow is unavailable or the file
+    cannot be processed (not an image, or animated) -- the original is then
+    served unchanged.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+
+    directory, filename = os.path.split(image_path)
+    stem, ext = os.path.splitext(filename)
+    try:
+        with Image.open(image_path) as source:
+            image_format = _SAVE_FORMATS.get(source.format)
+            if image_format is None or getattr(source, 'is_animated', False):
+                return None
+            # Apply the camera's EXIF rotation so widths and heights are the displayed ones
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except Exception as e:
+        print(f"⚠️ Could not create renditions for {image_path}: {e}")
+        return None
+
+    width, height = image.size
+    manifest = {'width': width, 'height': height, 'renditions': []}
+    for name, max_width in RENDITIONS:
+        rendition_width = min(max_width, width)
+        previous = manifest['renditions'][-1] if manifest['renditions'] else None
+        if previous and previous['width'] == rendition_width:
+            # The original is narrower than this size; reuse the previous files
+            manifest['renditions'].append(dict(previous, name=name))
+            continue
+
+        rendition_height = max(1, round(height * rendition_width / width))
+        resized = image if rendition_width == width else \
+            image.resize((rendition_width, rendition_height), Image.LANCZOS)
+
+        base = f'{stem}-{rendition_width}w'
+        _save(resized, os.path.join(directory, base + ext), image_format)
+        if image_format != 'WEBP':
+            _save(resized, os.path.join(directory, base + '.webp'), 'WEBP')
+        manifest['renditions'].append({
+            'name': name,
+            'width': rendition_width,
+            'height': rendition_height,
+            'url': f'{url_prefix}/{base}{ext}',
+            'webp_url': f'{url_prefix}/{base}.webp',
+        })
+
+    temporary = _temporary_path(_manifest_path(image_path))
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(temporary, _manifest_path(image_path))
+    return manifest
+
+
+def image_path(image_url, upload_folder, url_prefix=IMAGE_URL_PREFIX):
+    """Filesystem path of an uploaded image URL, or None for external URLs"""
+    if not image_url or not image_url.startswith(url_prefix + '/'):
+        return None
+    relative = posixpath.normpath(image_url[len(url_prefix) + 1:])
+    if relative.startswith(('..', '/')):
+        return None
+    return os.path.join(upload_folder, *relative.split('/'))
+
+
+def load_renditions(image_url, upload_folder, url_prefix=IMAGE_URL_PREFIX):
+    """The manifest for an uploaded image URL, or None for external URLs and images without renditions"""
+    path = image_path(image_url, upload_folder, url_prefix)
+    if path is None:
+        return None
+    try:
+        with open(_manifest_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pick_rendition(manifest, name):
+    """The rendition called ``name``, falling back to the largest one"""
+    renditions = manifest['renditions']
+    return next((r for r in renditions if r['name'] == name), renditions[-1])
+
+
+def srcset(manifest, webp=False):
+    """A srcset attribute value listing each distinct rendition width"""
+    key = 'webp_url' if webp else 'url'
+    seen, candidates = set(), []
+    for rendition in manifest['renditions']:
+        if rendition['width'] not in seen:
+            seen.add(rendition['width'])
+            candidates.append(f"{rendition[key]} {rendition['width']}w")
+    return ', '.join(candidates)
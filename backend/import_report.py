@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Import-Time Report for Daily Post
+Imports app.py in a fresh interpreter under ``python -X importtime`` and
+prints where the time went. Every new serverless instance pays this before
+its first response, so track it when adding dependencies: anything only the
+admin, CLI or upload paths need belongs in a function-level import.
+
+Usage:
+    python import_report.py                   # as on Vercel (VERCEL=1), top 20 packages
+    python import_report.py --local           # with the local environment and .env
+    python import_report.py --modules --top 40
+    python import_report.py --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in the child interpreter; prints the wall time of `import app` in seconds
+IMPORT_APP = "import time; started = time.perf_counter(); import app; print(time.perf_counter() - started)"
+
+
+def measure(env):
+    """Import the app in a subprocess; returns (wall seconds, [(module, self_us, cumulative_us, depth)])"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', IMPORT_APP], cwd=BACKEND_DIR,
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"❌ Importing app failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+
+def by_package(modules):
+    """Self time summed per top-level package, slowest first"""
+    totals = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        totals[name.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the time spent importing app.py')
+    parser.add_argument('--local', action='store_true',
+                        help='use the current environment instead of simulating Vercel')
+    parser.add_argument('--modules', action='store_true', help='list individual modules, not packages')
+    parser.add_argument('--top', type=int, default=20, help='rows to print (default 20)')
+    parser.add_argument('--json', metavar='PATH', help='also write the full report to PATH')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.local:
+        env.update({'VERCEL': '1', 'FLASK_ENV': 'production'})
+
+    wall, modules = measure(env)
+    rows = [(name, self_us) for name, self_us, _, _ in sorted(modules, key=lambda m: m[1], reverse=True)] \
+        if args.modules else by_package(modules)
+    total_us = sum(self_us for _, self_us, _, _ in modules)
+
+    print(f"⏱️  import app: {wall * 1000:.1f} ms wall, {len(modules)} modules "
+          f"({'local environment' if args.local else 'serverless, as on Vercel'})")
+    print(f"{'module' if args.modules else 'package':<40} {'ms':>9} {'share':>7}")
+    for name, self_us in rows[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>9.1f} {100 * self_us / total_us:>6.1f}%")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'wall_ms': round(wall * 1000, 1),
+                'serverless': not args.local,
+                'packages': [{'name': name, 'self_ms': round(us / 1000, 2)} for name, us in by_package(modules)],
+                'modules': [{'name': name, 'self_ms': round(self_us / 1000, 2),
+                             'cumulative_ms': round(cumulative_us / 1000, 2), 'depth': depth}
+                            for name, self_us, cumulative_us, depth in modules],
+            }, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Background jobs for Daily Post
+Slow admin work (bulk edits, category renames, image renditions) is queued
+as a row in the ``job`` table and executed by a worker process, so admin
+requests return immediately and web workers stay free for readers. The
+database is the only broker: workers claim queued rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL and a conditional
+UPDATE everywhere, so any number of workers can share one queue.
+
+Run a worker with ``flask --app app jobs worker``. A job that was running
+when its worker died is requeued once it is older than ``stale_after``
+seconds, up to ``max_attempts`` runs in total.
+
+Workers record a heartbeat in ``worker_model`` while they run. When no
+worker has been seen for ``worker_timeout`` seconds, queued jobs would
+wait forever, so enqueuing warns and their status carries a warning.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _has_pending_changes(session):
+    return bool(session.new or session.dirty or session.deleted)
+
+
+class JobRunner:
+    """Queue and execute jobs stored in ``model`` through a Flask-SQLAlchemy ``db``"""
+
+    def __init__(self, db, model, worker_model=None, max_attempts=3, stale_after=600, inline=False,
+                 heartbeat_interval=10, worker_timeout=60):
+        self.db = db
+        self.model = model
+        self.worker_model = worker_model
+        self.max_attempts = max_attempts
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_timeout = worker_timeout
+        # Run jobs in the enqueuing request instead (for hosts with no worker process)
+        self.inline = inline
+        self.handlers = {}
+
+    def handler(self, kind):
+        """Register ``function(payload) -> result`` as the handler for jobs of ``kind``"""
+        def decorator(function):
+            self.handlers[kind] = function
+            return function
+        return decorator
+
+    def enqueue(self, kind, payload=None):
+        """Queue a job and return it (already finished when the runner is inline).
+
+        The job row is committed in a session of its own, leaving the caller's
+        transaction alone. Commit whatever the job reads first: a worker may
+        pick the job up right away.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        if self.inline and _has_pending_changes(self.db.session):
+            # Running the job commits or rolls back the request's session
+            raise RuntimeError(f'Commit pending changes before enqueueing the inline {kind} job')
+        job = self.model(kind=kind, payload=payload or {}, status=QUEUED, attempts=0)
+        with self.db.session.session_factory(expire_on_commit=False) as session:
+            session.add(job)
+            session.commit()
+        if self.inline:
+            self.claim(worker='inline', job_id=job.id)
+            job = self.run(job)
+        elif not self.workers_alive():
+            print(f"⚠️ Job {job.id} ({kind}) queued but no job worker has been seen for "
+                  f"{self.worker_timeout}s; start one with 'flask --app app jobs worker'")
+        return job
+
+    def claim(self, worker, job_id=None):
+        """Mark the oldest queued job (or ``job_id``) as running for ``worker``; None if there is none"""
+        session = self.db.session
+        Job = self.model
+        while True:
+            candidate = session.query(Job.id).filter(Job.status == QUEUED)
+            if job_id is not None:
+                candidate = candidate.filter(Job.id == job_id)
+            candidate = candidate.order_by(Job.id)
+            if session.get_bind().dialect.name == 'postgresql':
+                # Skip rows another worker is claiming right now instead of queueing behind it
+                candidate = candidate.with_for_update(skip_locked=True)
+            row = candidate.first()
+            if row is None:
+                session.rollback()
+                return None
+
+            claimed = session.execute(
+                update(Job).where(Job.id == row.id, Job.status == QUEUED)
+                .values(status=RUNNING, worker=worker, started_at=_now(), attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            if claimed:
+                return session.get(Job, row.id)
+            if job_id is not None:
+                return None
+            # Another worker won the race for that row; try the next one
+
+    def run(self, job):
+        """Execute a claimed job, recording its result or error"""
+        session = self.db.session
+        job_id = job.id
+        try:
+            handler = self.handlers[job.kind]
+            result = handler(dict(job.payload or {}))
+        except Exception as e:
+            session.rollback()
+            job = session.get(self.model, job_id)
+            job.status = FAILED
+            job.error = f'{type(e).__name__}: {e}'
+            print(f"❌ Job {job_id} ({job.kind}) failed:\n{traceback.format_exc()}")
+        else:
+            job = session.get(self.model, job_id)
+            job.status = SUCCEEDED
+            job.result = result
+        job.finished_at = _now()
+        session.commit()
+        return job
+
+    def requeue_stale(self):
+        """Requeue jobs whose worker died mid-run; fail them once they are out of attempts"""
+        Job = self.model
+        cutoff = _now() - timedelta(seconds=self.stale_after)
+        stale = (Job.status == RUNNING) & (Job.started_at < cutoff)
+        session = self.db.session
+        session.execute(update(Job).where(stale, Job.attempts < self.max_attempts)
+                        .values(status=QUEUED, worker=None)
+                        .execution_options(synchronize_session=False))
+        session.execute(update(Job).where(stale, Job.attempts >= self.max_attempts)
+                        .values(status=FAILED, error='Worker stopped while running the job', finished_at=_now())
+                        .execution_options(synchronize_session=False))
+        session.commit()
+
+    # Worker heartbeats
+
+    def heartbeat(self, worker):
+        """Record that ``worker`` is alive"""
+        if self.worker_model is None:
+            return
+        session = self.db.session
+        row = session.get(self.worker_model, worker)
+        if row is None:
+            row = self.worker_model(name=worker, started_at=_now())
+            session.add(row)
+        row.seen_at = _now()
+        session.commit()
+
+    def forget_worker(self, worker):
+        if self.worker_model is None:
+            return
+        session = self.db.session
+        session.query(self.worker_model).filter(self.worker_model.name == worker) \
+            .delete(synchronize_session=False)
+        session.commit()
+
+    def workers_alive(self):
+        """Number of workers seen within ``worker_timeout`` seconds (None when heartbeats are not recorded)"""
+        if self.inline or self.worker_model is None:
+            return None
+        cutoff = _now() - timedelta(seconds=self.worker_timeout)
+        with self.db.session.no_autoflush:
+            return self.db.session.query(self.worker_model) \
+                .filter(self.worker_model.seen_at >= cutoff).count()
+
+    def worker_warning(self, job, workers_alive=None):
+        """Why a queued ``job`` is not being picked up, or None.
+
+        Pass ``workers_alive()`` when checking many jobs, so it is queried once.
+        """
+        if job.status != QUEUED:
+            return None
+        if workers_alive is None:
+            workers_alive = self.workers_alive()
+        if workers_alive != 0:
+            return None
+        return f'No job worker has been seen for {self.worker_timeout}s; the job stays queued until one starts.'
+
+    def work(self, app, poll_interval=1.0, once=False, stop=None, name=None):
+        """Worker loop: claim and run jobs until ``stop`` is set (or the queue is empty, with ``once``)"""
+        worker = name or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        stop = stop or threading.Event()
+        # Heartbeats come from their own thread, so a long job does not make the worker look dead
+        stopped = threading.Event()
+        beating = threading.Thread(target=self._beat, args=(app, worker, stopped),
+                                   name=f'{threading.current_thread().name}-heartbeat', daemon=True)
+        beating.start()
+        with app.app_context():
+            try:
+                self._work(worker, poll_interval, once, stop)
+            finally:
+                stopped.set()
+                beating.join(5)
+                try:
+                    self.db.session.rollback()
+                    self.forget_worker(worker)
+                except Exception:
+                    pass  # the row simply ages out
+
+    def _beat(self, app, worker, stopped):
+        with app.app_context():
+            while True:
+                try:
+                    self.heartbeat(worker)
+                except Exception as e:
+                    self.db.session.rollback()
+                    print(f"⚠️ Job worker {worker} could not record its heartbeat: {e}")
+                finally:
+                    self.db.session.remove()
+                if stopped.wait(self.heartbeat_interval):
+                    return
+
+    def _work(self, worker, poll_interval, once, stop):
+        self.requeue_stale()
+        last_requeue = time.monotonic()
+        while not stop.is_set():
+            try:
+                job = self.claim(worker)
+            except Exception as e:
+                self.db.session.rollback()
+                print(f"⚠️ Job worker {worker} could not poll the queue: {e}")
+                job = None
+            if job is not None:
+                self.run(job)
+                continue
+            if once:
+                break
+            stop.wait(poll_interval)
+            if time.monotonic() - last_requeue > min(self.stale_after, 60):
+                self.requeue_stale()
+                last_requeue = time.monotonic()
+            # Release the connection while idle
+            self.db.session.remove()
+
+    def start_threads(self, app, count=1, poll_interval=1.0):
+        """Run ``count`` worker loops in daemon threads of this process (for development servers)"""
+        stop = threading.Event()
+        for i in range(count):
+            threading.Thread(target=self.work, args=(app, poll_interval), kwargs={'stop': stop},
+                             name=f'job-worker-{i}', daemon=True).start()
+        return stop
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+HTTP Load Generator for Daily Post
+Keeps ``concurrency`` keep-alive connections busy against a running server
+for a fixed duration and reports throughput and latency percentiles. Uses
+only the standard library, so it runs anywhere the app does.
+
+Also starts gunicorn against a throwaway SQLite database seeded with
+synthetic posts, for load_suite.py and compare_servers.py.
+
+Usage:
+    python loadtest.py http://127.0.0.1:8000 / /api/posts /post/1 --concurrency 32 --duration 15
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# One request to send: a bare path string means GET with no body
+Request = namedtuple('Request', 'method path body headers', defaults=(None, None))
+
+# Bootstraps the schema and adds synthetic posts, in a child process using DATABASE_URL
+SEED_SCRIPT = """
+from app import app, bootstrap
+from explain_routes import seed_posts
+with app.app_context():
+    bootstrap(sample_data=False)
+    seed_posts({count})
+"""
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (None when empty)"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed, statuses):
+    """Throughput, error rate and latency percentiles (milliseconds) for one run"""
+    latencies = sorted(latencies)
+    requests = len(latencies) + errors
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': round(errors / requests, 4) if requests else 0.0,
+        'seconds': round(elapsed, 2),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': _ms(percentile(latencies, 0.50)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+        'max_ms': _ms(latencies[-1] if latencies else None),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=lambda s: str(s[0]))},
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class _Client(threading.Thread):
+    """One connection issuing requests back to back, cycling through ``requests``"""
+
+    def __init__(self, target, requests, offset, timeout, measure_from, stop, headers):
+        super().__init__(daemon=True)
+        self.target = target
+        self.requests = requests
+        self.headers = headers
+        self.offset = offset
+        self.timeout = timeout
+        self.measure_from = measure_from
+        self.stop = stop
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.target.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.target.hostname, self.target.port, timeout=self.timeout)
+
+    def run(self):
+        connection = self._connect()
+        i = self.offset
+        while not self.stop.is_set():
+            request = self.requests[i % len(self.requests)]
+            i += 1
+            headers = dict(self.headers, **(request.headers or {}))
+            started = time.perf_counter()
+            try:
+                connection.request(request.method, request.path, body=request.body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                if response.will_close:
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                status = 'connection error'
+                connection.close()
+                connection = self._connect()
+            finished = time.perf_counter()
+
+            if started < self.measure_from:
+                continue  # warm-up request
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if isinstance(status, int) and status < 400:
+                self.latencies.append(finished - started)
+            else:
+                self.errors += 1
+        connection.close()
+
+
+def run_load(base_url, requests, concurrency=16, duration=10.0, warmup=1.0, timeout=10.0, cookie=None):
+    """Send ``requests`` in turn from ``concurrency`` connections for ``duration`` seconds.
+
+    Each item is a path (relative to ``base_url``) to GET or a Request.
+    Requests in the first ``warmup`` seconds are not counted. Responses with
+    a status of 400 or above and failed connections count as errors.
+    """
+    target = urlsplit(base_url)
+    prefix = target.path.rstrip('/')
+    requests = [Request('GET', prefix + r) if isinstance(r, str) else r._replace(path=prefix + r.path)
+                for r in requests]
+    headers = {'Accept-Encoding': 'identity'}
+    if cookie:
+        headers['Cookie'] = cookie
+    stop = threading.Event()
+    measure_from = time.perf_counter() + warmup
+    clients = [_Client(target, requests, i, timeout, measure_from, stop, headers) for i in range(concurrency)]
+    for client in clients:
+        client.start()
+
+    time.sleep(warmup + duration)
+    stop.set()
+    elapsed = time.perf_counter() - measure_from
+    for client in clients:
+        client.join(timeout + 1)
+
+    latencies, errors, statuses = [], 0, {}
+    for client in clients:
+        latencies += client.latencies
+        errors += client.errors
+        for status, count in client.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    result = summarize(latencies, errors, elapsed, statuses)
+    result['concurrency'] = concurrency
+    return result
+
+
+def form_post(path, fields):
+    """A form-encoded POST Request; ``fields`` may repeat keys as a list of pairs"""
+    return Request('POST', path, urlencode(fields, doseq=True),
+                   {'Content-Type': 'application/x-www-form-urlencoded'})
+
+
+def login_cookie(base_url, username, password):
+    """Log in to /admin/login and return the session cookie ("name=value") for admin requests"""
+    target = urlsplit(base_url)
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+    request = form_post(target.path.rstrip('/') + '/admin/login', {'username': username, 'password': password})
+    try:
+        connection.request(request.method, request.path, body=request.body, headers=request.headers)
+        response = connection.getresponse()
+        response.read()
+        cookies = [header.split(';', 1)[0] for name, header in response.getheaders() if name.lower() == 'set-cookie']
+    finally:
+        connection.close()
+    if response.status != 302 or not cookies:
+        raise RuntimeError(f'Admin login as {username!r} failed (HTTP {response.status})')
+    return '; '.join(cookies)
+
+
+def seed_database(database_url, posts):
+    """Bootstrap the schema at ``database_url`` and add ``posts`` synthetic posts"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run([sys.executable, '-c', SEED_SCRIPT.format(count=posts)], cwd=BACKEND_DIR,
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_serving(url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return True
+        except OSError:
+            time.sleep(0.25)
+    return False
+
+
+@contextmanager
+def gunicorn_server(env, profile='sync', workers=None):
+    """Run gunicorn with a gunicorn.conf.py profile on a free local port; yields its base URL"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(env, GUNICORN_PROFILE=profile, GUNICORN_BIND=f'127.0.0.1:{port}')
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        if not wait_until_serving(base_url + '/', server):
+            server.terminate()
+            error = server.communicate(timeout=10)[1].decode(errors='replace')[-1500:]
+            raise RuntimeError(f'gunicorn ({profile}) did not start:\n{error}')
+        yield base_url
+    finally:
+        if server.poll() is None:
+            server.terminate()
+            try:
+                server.wait(timeout=35)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test a running Daily Post server')
+    parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000')
+    parser.add_argument('paths', nargs='*', default=['/'], help='paths to request in turn (default /)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to measure')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds before measuring')
+    args = parser.parse_args()
+
+    result = run_load(args.base_url, args.paths, args.concurrency, args.duration, args.warmup)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Request metrics for Daily Post
+Times every request per endpoint, counts the SQL statements it runs and the
+time spent in them (via SQLAlchemy cursor events) and times template
+rendering, then exposes it all in the Prometheus text format.
+
+Metrics live in the memory of each process: under gunicorn every worker
+keeps its own counters, and a scrape reports the worker that served it.
+Each metric therefore carries a ``pid`` label so samples from different
+workers are never mistaken for one counter going backwards.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observations for one label set"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(pairs):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Collects per-endpoint request metrics for the Flask apps it is attached to"""
+
+    HISTOGRAMS = {
+        'request_duration_seconds': ('Request latency by endpoint', LATENCY_BUCKETS),
+        'request_sql_statements': ('SQL statements executed per request by endpoint', STATEMENT_BUCKETS),
+        'request_sql_seconds': ('Time spent in SQL statements per request by endpoint', LATENCY_BUCKETS),
+        'template_render_seconds': ('Template render time by template', LATENCY_BUCKETS),
+    }
+
+    def __init__(self, prefix='dailypost'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests = {}  # (endpoint, method, status) -> count
+        self._histograms = {name: {} for name in self.HISTOGRAMS}  # name -> {label value: Histogram}
+        self._started = time.time()
+
+    def init_app(self, app, sql=True):
+        """Install the request hooks on ``app``; with ``sql``, also count SQLAlchemy statements"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._before_render, app, weak=False)
+        template_rendered.connect(self._after_render, app, weak=False)
+        if sql:
+            # Engine-class listeners also cover engines created after this call
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(Engine, 'handle_error', self._handle_error)
+
+    # Request hooks
+
+    def _before_request(self):
+        g.request_metrics = {'owner': self, 'started': time.perf_counter(), 'status': 500,
+                             'statements': 0, 'sql_seconds': 0.0, 'templates': []}
+
+    def _after_request(self, response):
+        current = g.get('request_metrics')
+        if current is not None and current['owner'] is self:
+            current['status'] = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        current = g.pop('request_metrics', None)
+        if current is None or current['owner'] is not self:
+            return
+        elapsed = time.perf_counter() - current['started']
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            key = (endpoint, request.method, str(current['status']))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._observe('request_duration_seconds', endpoint, elapsed)
+            self._observe('request_sql_statements', endpoint, current['statements'])
+            self._observe('request_sql_seconds', endpoint, current['sql_seconds'])
+
+    def _observe(self, name, label, value):
+        histograms = self._histograms[name]
+        if label not in histograms:
+            histograms[label] = Histogram(self.HISTOGRAMS[name][1])
+        histograms[label].observe(value)
+
+    # Template signals
+
+    def _before_render(self, sender, template, context, **extra):
+        current = g.get('request_metrics') if has_request_context() else None
+        if current is not None and current['owner'] is self:
+            current['templates'].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        current = g.get('request_metrics') if has_request_context() else None
+        if current is None or current['owner'] is not self or not current['templates']:
+            return
+        elapsed = time.perf_counter() - current['templates'].pop()
+        with self._lock:
+            self._observe('template_render_seconds', template.name or 'string', elapsed)
+
+    # SQLAlchemy events
+
+    def _current(self):
+        if not has_request_context():
+            return None
+        current = g.get('request_metrics')
+        return current if current is not None and current['owner'] is self else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._current() is not None:
+            conn.info.setdefault('request_metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        current = self._current()
+        started = conn.info.get('request_metrics_started')
+        if current is not None and started:
+            current['statements'] += 1
+            current['sql_seconds'] += time.perf_counter() - started.pop()
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        started = exception_context.connection.info.get('request_metrics_started') \
+            if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+    # Exposition
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        # Read at render time: preloaded gunicorn workers fork after this object is created
+        pid = ('pid', str(os.getpid()))
+        lines = []
+        with self._lock:
+            name = f'{self.prefix}_requests_total'
+            lines += [f'# HELP {name} Requests served by endpoint, method and status', f'# TYPE {name} counter']
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                labels = _labels([('endpoint', endpoint), ('method', method), ('status', status), pid])
+                lines.append(f'{name}{{{labels}}} {count}')
+
+            for metric, (description, buckets) in self.HISTOGRAMS.items():
+                name = f'{self.prefix}_{metric}'
+                label_name = 'template' if metric.startswith('template') else 'endpoint'
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for label, histogram in sorted(self._histograms[metric].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else _number(bound)
+                        labels = _labels([(label_name, label), pid, ('le', le)])
+                        lines.append(f'{name}_bucket{{{labels}}} {cumulative}')
+                    labels = _labels([(label_name, label), pid])
+                    lines.append(f'{name}_sum{{{labels}}} {_number(histogram.total)}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        name = f'{self.prefix}_process_start_time_seconds'
+        lines += [f'# HELP {name} Start time of this process since the epoch', f'# TYPE {name} gauge',
+                  f'{name}{{{_labels([pid])}}} {_number(self._started)}']
+        return '\n'.join(lines) + '\n'
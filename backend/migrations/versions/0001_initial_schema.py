@@ -0,0 +1,55 @@
+"""Initial schema: user and post tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Databases created earlier with db.create_all() already have these tables;
+they are left untouched so the revision can be applied (or stamped) on them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('user'):
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('password_hash', sa.String(length=120), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=True),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+
+    if not inspector.has_table('post'):
+        op.create_table(
+            'post',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=200), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('author', sa.String(length=100), nullable=False),
+            sa.Column('date_posted', sa.DateTime(), nullable=False),
+            sa.Column('category', sa.String(length=50), nullable=False),
+            sa.Column('featured', sa.Boolean(), nullable=True),
+            sa.Column('image_url', sa.String(length=500), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('post')
+    op.drop_table('user')
@@ -0,0 +1,45 @@
+"""Indexes for the public Post read paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+- ix_post_date_posted_id:       / and /api/posts (ORDER BY date_posted DESC, id DESC keyset)
+- ix_post_featured_date_posted: featured strip on / (featured = true ORDER BY date_posted DESC)
+- ix_post_category_date_posted: /category/<c> (category = :c ORDER BY date_posted DESC)
+- ix_post_author:               admin filtering and per-author counts
+
+On PostgreSQL the indexes are built CONCURRENTLY outside the migration
+transaction so a large post table stays writable while they build.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+POST_INDEXES = [
+    ('ix_post_date_posted_id', ['date_posted', 'id']),
+    ('ix_post_featured_date_posted', ['featured', 'date_posted']),
+    ('ix_post_category_date_posted', ['category', 'date_posted']),
+    ('ix_post_author', ['author']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, columns in POST_INDEXES:
+            op.create_index(name, 'post', columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _columns in reversed(POST_INDEXES):
+            op.drop_index(name, table_name='post', if_exists=True,
+                          postgresql_concurrently=True)
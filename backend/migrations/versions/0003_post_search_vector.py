@@ -0,0 +1,50 @@
+"""Full-text search column and GIN index on post
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+Adds a generated tsvector column (title weight A, author C, content B) kept
+up to date by PostgreSQL on every insert/update, plus a GIN index for /search.
+The expression must match SEARCH_VECTOR_EXPRESSION in search.py.
+PostgreSQL 12+ only; other databases keep using LIKE matching.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(author, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index('ix_post_search_vector', 'post', ['search_vector'], unique=False,
+                        if_not_exists=True, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_post_search_vector', table_name='post', if_exists=True,
+                      postgresql_concurrently=True)
+    op.execute("ALTER TABLE post DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,32 @@
+"""Add post.updated_at for conditional GET validators
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:30:00.000000
+
+Existing rows start with updated_at = date_posted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True,
+                                      server_default=sa.func.now()))
+    op.execute("UPDATE post SET updated_at = date_posted")
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False,
+                              existing_server_default=sa.func.now())
+
+
+def downgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,154 @@
+"""Post statistics summary table maintained by triggers
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+Creates post_stat (total / per-category / per-author post and featured
+counts), installs the triggers that keep it current on every insert, update
+and delete of post, and backfills it. The SQL mirrors post_stats.py at the
+time of this revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+POSTGRESQL_TRIGGERS = [
+    """CREATE OR REPLACE FUNCTION post_stat_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO post_stat (kind, key, post_count, featured_count)
+        SELECT CASE WHEN GROUPING(category) = 0 THEN 'category'
+                    WHEN GROUPING(author) = 0 THEN 'author'
+                    ELSE 'total' END,
+               CASE WHEN GROUPING(category) = 0 THEN category
+                    WHEN GROUPING(author) = 0 THEN author
+                    ELSE '' END,
+               SUM(sign)::integer,
+               SUM(CASE WHEN featured THEN sign ELSE 0 END)::integer
+        FROM (SELECT category, author, featured, 1 AS sign FROM new_rows) AS delta
+        GROUP BY GROUPING SETS ((category), (author), ())
+        HAVING SUM(sign) <> 0 OR SUM(CASE WHEN featured THEN sign ELSE 0 END) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (kind, key) DO UPDATE
+            SET post_count = post_stat.post_count + EXCLUDED.post_count,
+                featured_count = post_stat.featured_count + EXCLUDED.featured_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO post_stat (kind, key, post_count, featured_count)
+        SELECT CASE WHEN GROUPING(category) = 0 THEN 'category'
+                    WHEN GROUPING(author) = 0 THEN 'author'
+                    ELSE 'total' END,
+               CASE WHEN GROUPING(category) = 0 THEN category
+                    WHEN GROUPING(author) = 0 THEN author
+                    ELSE '' END,
+               SUM(sign)::integer,
+               SUM(CASE WHEN featured THEN sign ELSE 0 END)::integer
+        FROM (SELECT category, author, featured, -1 AS sign FROM old_rows) AS delta
+        GROUP BY GROUPING SETS ((category), (author), ())
+        HAVING SUM(sign) <> 0 OR SUM(CASE WHEN featured THEN sign ELSE 0 END) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (kind, key) DO UPDATE
+            SET post_count = post_stat.post_count + EXCLUDED.post_count,
+                featured_count = post_stat.featured_count + EXCLUDED.featured_count;
+    ELSE
+        INSERT INTO post_stat (kind, key, post_count, featured_count)
+        SELECT CASE WHEN GROUPING(category) = 0 THEN 'category'
+                    WHEN GROUPING(author) = 0 THEN 'author'
+                    ELSE 'total' END,
+               CASE WHEN GROUPING(category) = 0 THEN category
+                    WHEN GROUPING(author) = 0 THEN author
+                    ELSE '' END,
+               SUM(sign)::integer,
+               SUM(CASE WHEN featured THEN sign ELSE 0 END)::integer
+        FROM (SELECT category, author, featured, 1 AS sign FROM new_rows UNION ALL SELECT category, author, featured, -1 AS sign FROM old_rows) AS delta
+        GROUP BY GROUPING SETS ((category), (author), ())
+        HAVING SUM(sign) <> 0 OR SUM(CASE WHEN featured THEN sign ELSE 0 END) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (kind, key) DO UPDATE
+            SET post_count = post_stat.post_count + EXCLUDED.post_count,
+                featured_count = post_stat.featured_count + EXCLUDED.featured_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+    """DROP TRIGGER IF EXISTS post_stat_insert ON post""",
+    """DROP TRIGGER IF EXISTS post_stat_update ON post""",
+    """DROP TRIGGER IF EXISTS post_stat_delete ON post""",
+    """CREATE TRIGGER post_stat_insert AFTER INSERT ON post
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+    """CREATE TRIGGER post_stat_update AFTER UPDATE ON post
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+    """CREATE TRIGGER post_stat_delete AFTER DELETE ON post
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+]
+
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS post_stat_insert AFTER INSERT ON post
+BEGIN
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('total', '', 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('category', NEW.category, 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('author', NEW.author, 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS post_stat_update AFTER UPDATE OF category, author, featured ON post
+BEGIN
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('total', '', -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('category', OLD.category, -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('author', OLD.author, -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('total', '', 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('category', NEW.category, 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('author', NEW.author, 1, 1 * COALESCE(NEW.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS post_stat_delete AFTER DELETE ON post
+BEGIN
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('total', '', -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('category', OLD.category, -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+    INSERT INTO post_stat (kind, key, post_count, featured_count) VALUES ('author', OLD.author, -1, -1 * COALESCE(OLD.featured, 0)) ON CONFLICT (kind, key) DO UPDATE SET post_count = post_count + excluded.post_count, featured_count = featured_count + excluded.featured_count;
+END""",
+]
+
+REBUILD_STATEMENTS = [
+    """DELETE FROM post_stat""",
+    """INSERT INTO post_stat (kind, key, post_count, featured_count)
+    SELECT 'total', '', COUNT(*), COALESCE(SUM(CASE WHEN featured THEN 1 ELSE 0 END), 0) FROM post
+    UNION ALL
+    SELECT 'category', category, COUNT(*), SUM(CASE WHEN featured THEN 1 ELSE 0 END) FROM post GROUP BY category
+    UNION ALL
+    SELECT 'author', author, COUNT(*), SUM(CASE WHEN featured THEN 1 ELSE 0 END) FROM post GROUP BY author""",
+]
+
+
+def upgrade():
+    op.create_table(
+        'post_stat',
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('post_count', sa.Integer(), nullable=False),
+        sa.Column('featured_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'key')
+    )
+
+    dialect = op.get_bind().dialect.name
+    triggers = {'postgresql': POSTGRESQL_TRIGGERS, 'sqlite': SQLITE_TRIGGERS}.get(dialect, [])
+    for statement in triggers + REBUILD_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for trigger in ('post_stat_insert', 'post_stat_update', 'post_stat_delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON post")
+        op.execute("DROP FUNCTION IF EXISTS post_stat_apply()")
+    else:
+        for trigger in ('post_stat_insert', 'post_stat_update', 'post_stat_delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.drop_table('post_stat')
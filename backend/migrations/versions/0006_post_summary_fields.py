@@ -0,0 +1,32 @@
+"""Add precomputed post.excerpt, word_count and reading_time
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 12:30:00.000000
+
+The columns start out NULL; fill them with ``flask --app app backfill-summaries``.
+List views compute the excerpt in SQL for rows that have not been backfilled.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=320), nullable=True))
+        batch_op.add_column(sa.Column('word_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('reading_time', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.drop_column('reading_time')
+        batch_op.drop_column('word_count')
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,27 @@
+"""Add post.image_renditions for responsive uploaded images
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 13:30:00.000000
+
+Existing posts keep serving their original image until it is re-uploaded.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.add_column(sa.Column('image_renditions', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.drop_column('image_renditions')
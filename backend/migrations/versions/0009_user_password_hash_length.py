@@ -0,0 +1,29 @@
+"""Widen user.password_hash for scrypt and higher-cost hashes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 16:00:00.000000
+
+A werkzeug scrypt hash is about 160 characters, longer than the original 120.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password_hash', existing_type=sa.String(length=120),
+                              type_=sa.String(length=255), existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password_hash', existing_type=sa.String(length=255),
+                              type_=sa.String(length=120), existing_nullable=False)
@@ -0,0 +1,49 @@
+"""Add id to the category and featured read indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 17:00:00.000000
+
+Keyset pages are ordered by (date_posted, id) and resume with a row-value
+predicate on both columns, so the filtered indexes carry id as their last
+column too; the whole predicate and ORDER BY are then served by the index:
+
+- ix_post_featured_date_posted_id replaces ix_post_featured_date_posted
+- ix_post_category_date_posted_id replaces ix_post_category_date_posted
+
+On PostgreSQL the new indexes are built CONCURRENTLY before the old ones are
+dropped, so the read paths are never without an index.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+REPLACED_INDEXES = [
+    ('ix_post_featured_date_posted', ['featured', 'date_posted'],
+     'ix_post_featured_date_posted_id', ['featured', 'date_posted', 'id']),
+    ('ix_post_category_date_posted', ['category', 'date_posted'],
+     'ix_post_category_date_posted_id', ['category', 'date_posted', 'id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for old_name, _old_columns, new_name, new_columns in REPLACED_INDEXES:
+            op.create_index(new_name, 'post', new_columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+            op.drop_index(old_name, table_name='post', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for old_name, old_columns, new_name, _new_columns in reversed(REPLACED_INDEXES):
+            op.create_index(old_name, 'post', old_columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+            op.drop_index(new_name, table_name='post', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""Add the job_worker table for job worker heartbeats
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job_worker',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('seen_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('job_worker')
@@ -0,0 +1,239 @@
+"""
+Rendered page cache for Daily Post
+Public pages are cached as finished responses keyed by endpoint and
+arguments. Every entry is tagged (e.g. ``index``, ``post:12``,
+``category:Sports``); the write routes invalidate tags, which makes exactly
+the affected pages miss on their next request.
+
+Invalidation works by version tokens stored next to the pages, so any
+backend with get/set/delete/get_many (the in-process LRUCache below, or a
+cachelib/Flask-Caching cache such as RedisCache) can be plugged in. The
+in-process backend is per worker; app.py then publishes invalidations to
+every worker (and from job workers) over PostgreSQL NOTIFY, see post_cache.py.
+
+Version tokens carry the time of the invalidation. A page rendered from data
+that may lag behind (a read replica, see ``lagging``) is not stored while any
+of its tags was invalidated less than ``hold_off`` seconds ago, so a replica
+that has not replayed the change yet cannot put the old page back.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request, session
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1000, default_timeout=300):
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get_many(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, timeout=None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PageCache:
+    """Tag-invalidated cache of rendered responses with hit/miss counters"""
+
+    KEY_PREFIX = 'page:'
+    TAG_PREFIX = 'tag:'
+
+    def __init__(self, backend=None, timeout=300, enabled=True, bypass=None, lagging=None, hold_off=0):
+        self.backend = backend if backend is not None else LRUCache(default_timeout=timeout)
+        self.timeout = timeout
+        self.enabled = enabled
+        # bypass() -> True: the request neither reads nor stores cached pages
+        self.bypass = bypass
+        # lagging() -> True: the page is being rendered from data up to hold_off seconds old
+        self.lagging = lagging
+        self.hold_off = hold_off
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'stale': 0, 'invalidations': 0, 'bypassed': 0,
+                          'held_off': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _tag_versions(self, tags):
+        """Current version token of each tag; missing tags get a fresh token"""
+        keys = [self.TAG_PREFIX + tag for tag in tags]
+        versions = dict(zip(tags, self.backend.get_many(*keys)))
+        for tag, version in versions.items():
+            if version is None:
+                # Never invalidated (or evicted): nothing recent for a lagging render to miss
+                versions[tag] = _new_version(0)
+                self.backend.set(self.TAG_PREFIX + tag, versions[tag], timeout=0)
+        return versions
+
+    def _held_off(self, versions, started):
+        """True when a lagging render may predate an invalidation of one of its tags"""
+        if not self.hold_off or self.lagging is None or not self.lagging():
+            return False
+        return any(_invalidated_at(version) > started - self.hold_off for version in versions.values())
+
+    def get(self, key):
+        """Return a cached (body, status, headers) tuple, or None on a miss or stale entry"""
+        entry = self.backend.get(self.KEY_PREFIX + key)
+        if entry is None:
+            self._count('misses')
+            return None
+
+        versions, page = entry
+        current = self.backend.get_many(*[self.TAG_PREFIX + tag for tag in versions])
+        if list(versions.values()) != current:
+            self._count('stale')
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return page
+
+    def set(self, key, page, tags=(), versions=None):
+        """Store ``page`` under the tag ``versions`` read before it was rendered (default: the current ones).
+
+        A tag invalidated while the page was being rendered then already
+        differs from the stored version, so the page misses instead of
+        keeping the pre-change content until the timeout.
+        """
+        if versions is None:
+            versions = self._tag_versions(tags)
+        self.backend.set(self.KEY_PREFIX + key, (versions, page), timeout=self.timeout)
+        self._count('stores')
+
+    def invalidate(self, *tags):
+        """Make every page carrying any of ``tags`` miss on its next request"""
+        now = time.time()
+        for tag in set(tags):
+            self.backend.set(self.TAG_PREFIX + tag, _new_version(now), timeout=0)
+            self._count('invalidations')
+
+    def clear(self):
+        self.backend.clear()
+
+    @property
+    def shared(self):
+        """True when every worker reads the same backend (e.g. Redis), False for the in-process LRU"""
+        return not isinstance(self.backend, LRUCache)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['backend'] = type(self.backend).__name__
+        if isinstance(self.backend, LRUCache):
+            stats['entries'] = len(self.backend)
+        return stats
+
+    def cached(self, tags):
+        """View decorator caching successful GET responses.
+
+        ``tags`` is called with the view's keyword arguments and returns the
+        tags the rendered page depends on.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or not _request_is_cacheable() or (self.bypass and self.bypass()):
+                    self._count('bypassed')
+                    return view(*args, **kwargs)
+
+                key = _request_key()
+                page = self.get(key)
+                if page is not None:
+                    body, status, headers = page
+                    response = Response(body, status=status, headers=headers)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                # Versions first: an invalidation during rendering must outdate this page
+                started = time.time()
+                versions = self._tag_versions(tags(**kwargs))
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    if self._held_off(versions, started):
+                        self._count('held_off')
+                    else:
+                        self.set(key, (response.get_data(), response.status_code,
+                                       list(response.headers.items())), versions=versions)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+
+def _new_version(invalidated_at):
+    return f'{uuid.uuid4().hex}:{invalidated_at}'
+
+
+def _invalidated_at(version):
+    """Wall-clock time (time.time()) stored in a version token; 0 when it has none"""
+    try:
+        return float(str(version).rpartition(':')[2])
+    except ValueError:
+        return 0.0
+
+
+def _request_is_cacheable():
+    # Pending flash messages are rendered into the page, so those pages are personal
+    return request.method in ('GET', 'HEAD') and '_flashes' not in session
+
+
+def _request_key():
+    args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    view_args = '&'.join(f'{k}={v}' for k, v in sorted((request.view_args or {}).items()))
+    return f'{request.endpoint}:{view_args}?{args}'
+
+
+def create_backend(redis_url=None, max_entries=1000, timeout=300):
+    """Build the configured cache backend: Redis via cachelib when a URL is given, else in-process LRU"""
+    if redis_url:
+        try:
+            from cachelib import RedisCache
+            import redis
+        except ImportError as e:
+            raise RuntimeError('PAGE_CACHE_REDIS_URL requires the cachelib and redis packages') from e
+        return RedisCache(host=redis.from_url(redis_url), default_timeout=timeout, key_prefix='dailypost:')
+    return LRUCache(max_entries=max_entries, default_timeout=timeout)
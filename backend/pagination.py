@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination helpers for Daily Post
+Pages are addressed by the sort key of their boundary rows instead of an
+OFFSET, so every page costs the same as the first and no COUNT(*) is needed.
+Listings use (date_posted, id); ranked search uses (rank, id).
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+# Cursor directions
+AFTER = 'a'   # rows after the cursor in display order (next page)
+BEFORE = 'b'  # rows before the cursor in display order (previous page)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(direction, key):
+    """Encode a page boundary (direction plus sort key values) as an opaque, URL-safe string"""
+    payload = json.dumps([direction] + [_encode_value(v) for v in key], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, key_length):
+    """Decode a cursor string into (direction, key); raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, *key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if direction not in (AFTER, BEFORE) or len(key) != key_length:
+            raise ValueError(direction)
+        return direction, tuple(_decode_value(v) for v in key)
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor!r}') from e
+
+
+class KeysetPage:
+    """One page of keyset-paginated results with next/prev cursors"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=5, key=None, ascending=False):
+    """Return a KeysetPage of ``query`` ordered by ``columns`` (descending unless ``ascending``).
+
+    ``columns`` is the sort key, most significant first, and must end in a
+    unique column (normally the primary key). ``key`` extracts the same values
+    from a result row; by default it reads each column's name as an attribute.
+    ``cursor`` is a value produced by a previous page's next_cursor/prev_cursor;
+    pass None for the first page. Raises ValueError for a malformed cursor.
+    """
+    columns = tuple(columns)
+    if key is None:
+        names = [column.key for column in columns]
+        key = lambda row: tuple(getattr(row, name) for name in names)
+
+    descending_order = [column.desc() for column in columns]
+    ascending_order = [column.asc() for column in columns]
+    if ascending:
+        forward_order, backward_order = ascending_order, descending_order
+    else:
+        forward_order, backward_order = descending_order, ascending_order
+    sort_key = tuple_(*columns)
+
+    if cursor is None:
+        direction = None
+        rows = query.order_by(*forward_order).limit(per_page + 1).all()
+    else:
+        direction, values = decode_cursor(cursor, len(columns))
+        after = sort_key > values if ascending else sort_key < values
+        before = sort_key < values if ascending else sort_key > values
+        if direction == AFTER:
+            rows = query.filter(after).order_by(*forward_order).limit(per_page + 1).all()
+        else:
+            rows = query.filter(before).order_by(*backward_order).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == BEFORE:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage([])
+
+    # Walking backwards, "more" means more rows before this page; otherwise more after it
+    more_after = direction == BEFORE or has_more
+    more_before = direction == AFTER or (direction == BEFORE and has_more)
+
+    next_cursor = encode_cursor(AFTER, key(rows[-1])) if more_after else None
+    prev_cursor = encode_cursor(BEFORE, key(rows[0])) if more_before else None
+    return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
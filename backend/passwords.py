@@ -0,0 +1,177 @@
+"""
+Password hashing for Daily Post logins
+Hashing a password is deliberately slow (hundreds of milliseconds of CPU at
+a sensible cost), so a burst of logins run on the request threads would take
+every core away from page serving. All hashing and verification goes through
+a PasswordHasher instead: a small bounded thread pool (hashlib's PBKDF2 and
+scrypt release the GIL, so it really runs in parallel) that rejects work
+beyond ``max_pending`` rather than queueing it without limit.
+
+Hashes use werkzeug's format (``method$salt$hash``), so existing hashes keep
+verifying. When the configured method or cost changes, verify_and_update()
+returns a fresh hash for the caller to store -- users are moved to the new
+cost as they log in.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+
+
+class HasherBusy(Exception):
+    """Too many hashes are queued, or one took longer than the timeout; the caller should ask the user to retry"""
+
+
+class PasswordHasher:
+    """Hash and verify passwords on a bounded pool of threads.
+
+    ``method`` is any werkzeug method string, e.g. ``pbkdf2:sha256:600000``
+    or ``scrypt:32768:8:1``. At most ``max_workers`` hashes run at once and
+    at most ``max_pending`` may be queued or running; callers wait up to
+    ``timeout`` seconds for their result.
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, max_workers=None, max_pending=None, timeout=10):
+        self.method = method
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending or self.max_workers * 8
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._prefix = None
+        self._counters = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0, 'timed_out': 0}
+
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters['rejected'] += 1
+            raise HasherBusy(f'More than {self.max_pending} password hashes pending')
+        with self._lock:
+            # Created on first use, so importing the app starts no threads
+            if self._executor is None:
+                self._executor = _make_executor(self.max_workers)
+            executor = self._executor
+        try:
+            future = executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # Not the builtin TimeoutError before Python 3.11
+            with self._lock:
+                self._counters['timed_out'] += 1
+            raise HasherBusy(f'Password hash took longer than {self.timeout}s') from None
+
+    def hash(self, password):
+        """A new hash of ``password`` at the configured method and cost"""
+        pwhash = self._submit(generate_password_hash, password, self.method)
+        with self._lock:
+            self._counters['hashed'] += 1
+        return pwhash
+
+    def verify(self, pwhash, password):
+        """Whether ``password`` matches ``pwhash`` (any method werkzeug understands)"""
+        if not pwhash or password is None:
+            return False
+        matches = self._submit(check_password_hash, pwhash, password)
+        with self._lock:
+            self._counters['verified'] += 1
+        return matches
+
+    def needs_rehash(self, pwhash):
+        """Whether ``pwhash`` was made with a different method or cost than the configured one"""
+        if self._prefix is None:
+            # werkzeug fills in default parameters ("pbkdf2" -> "pbkdf2:sha256:600000");
+            # hash once to learn the exact prefix it writes
+            self._prefix = self._submit(generate_password_hash, '', self.method).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+    def verify_and_update(self, pwhash, password):
+        """(matches, new_hash): new_hash is set when the password matched but its hash is outdated"""
+        if not self.verify(pwhash, password):
+            return False, None
+        if not self.needs_rehash(pwhash):
+            return True, None
+        with self._lock:
+            self._counters['rehashed'] += 1
+        return True, self.hash(password)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update({'method': self.method, 'workers': self.max_workers, 'max_pending': self.max_pending})
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _make_executor(max_workers):
+    gevent_monkey = sys.modules.get('gevent.monkey')
+    if gevent_monkey is not None and gevent_monkey.is_module_patched('threading'):
+        # Patched threads are greenlets sharing one OS thread; hash on gevent's native thread pool
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor(max_workers)
+    return ThreadPoolExecutor(max_workers, thread_name_prefix='password-hasher')
+
+
+def hasher_from_env(prefix='PASSWORD_HASH'):
+    """A PasswordHasher configured by PASSWORD_HASH_METHOD, _WORKERS, _MAX_PENDING and _TIMEOUT"""
+    return PasswordHasher(
+        method=os.environ.get(f'{prefix}_METHOD', DEFAULT_METHOD),
+        max_workers=int(os.environ.get(f'{prefix}_WORKERS', 0)) or None,
+        max_pending=int(os.environ.get(f'{prefix}_MAX_PENDING', 0)) or None,
+        timeout=float(os.environ.get(f'{prefix}_TIMEOUT', 10)),
+    )
+
+
+def benchmark(method, threads=1, seconds=3.0):
+    """Verify one password repeatedly from ``threads`` threads for ``seconds``.
+
+    Returns {'method', 'threads', 'logins', 'seconds', 'logins_per_sec',
+    'logins_per_sec_per_core', 'ms_per_login'}; "per core" divides by the
+    number of threads, assuming one core each.
+    """
+    pwhash = generate_password_hash('benchmark-password', method)
+    count = [0] * threads
+    stop = threading.Event()
+
+    def loop(i):
+        while not stop.is_set():
+            check_password_hash(pwhash, 'benchmark-password')
+            count[i] += 1
+
+    workers = [threading.Thread(target=loop, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    logins = sum(count)
+    rate = logins / elapsed
+    return {
+        'method': method,
+        'threads': threads,
+        'logins': logins,
+        'seconds': round(elapsed, 2),
+        'logins_per_sec': round(rate, 1),
+        'logins_per_sec_per_core': round(rate / threads, 1),
+        'ms_per_login': round(1000 * threads / rate, 1) if rate else None,
+    }
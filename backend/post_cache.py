@@ -0,0 +1,287 @@
+"""
+Post object cache for Daily Post
+Keeps recently read posts in each worker's memory, as plain column values
+keyed by id, so hot articles are served without a query. Entries expire
+after ``ttl`` seconds and the least recently used are evicted first.
+
+Writes invalidate entries in every worker:
+
+* PostgreSQL -- the write routes publish the changed ids with NOTIFY on the
+  ``post_cache`` channel, and every worker LISTENs on its own connection in a
+  background thread. While that connection is down the cache is emptied and
+  falls back to polling (below) until it is back.
+* Other databases (SQLite) -- an entry is re-checked against the post's
+  ``updated_at`` at most every ``poll_interval`` seconds, so other workers'
+  changes show up within that interval.
+
+Writes that bypass the write routes (raw SQL) are covered by the polling
+check or, at the latest, by the TTL.
+
+The same channel carries page cache invalidations (``pages:`` followed by a
+JSON list of tags) for in-process page caches, so writes made by job workers
+and by other web workers reach every worker's cached pages too.
+"""
+
+import json
+import os
+import select
+import threading
+import time
+
+from flask import abort
+from sqlalchemy import Column, func, inspect, select as sql_select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from page_cache import LRUCache
+
+CHANNEL = 'post_cache'
+
+# Payload prefix of page cache invalidations on CHANNEL
+PAGES_PREFIX = 'pages:'
+
+# NOTIFY payloads must stay under 8000 bytes; longer id lists invalidate everything
+MAX_PAYLOAD = 7900
+
+# Seconds between reconnection attempts of the LISTEN connection
+RECONNECT_DELAY = 5
+
+
+def pages_payload(tags):
+    """NOTIFY payload invalidating page cache ``tags`` in every worker ('*': all pages)"""
+    if tags == '*':
+        return PAGES_PREFIX + '*'
+    payload = PAGES_PREFIX + json.dumps(sorted(set(tags)), ensure_ascii=False, separators=(',', ':'))
+    if len(payload.encode('utf-8')) > MAX_PAYLOAD:
+        payload = PAGES_PREFIX + '*'
+    return payload
+
+
+class PostCache:
+    """Per-worker LRU cache of posts with cross-worker invalidation"""
+
+    def __init__(self, db, model, ttl=300, max_entries=1000, poll_interval=5, hold_off=0, enabled=True):
+        self.db = db
+        self.model = model
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        # Changed posts are not cached again for this long (lets read replicas catch up)
+        self.hold_off = hold_off
+        self.enabled = enabled
+        self.entries = LRUCache(max_entries=max_entries, default_timeout=ttl)
+        # Mapped table columns only (not query_expression placeholders such as Post.preview)
+        self.columns = [attr.key for attr in inspect(model).column_attrs
+                        if isinstance(attr.expression, Column) and attr.expression.table is model.__table__]
+        self._invalidated = {}  # id -> monotonic time of its last invalidation
+        self._cleared_at = 0.0
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'invalidations': 0, 'notifications': 0}
+        self._lock = threading.Lock()
+        self._listening = False
+        self._listener_pid = None
+        self._page_handlers = []
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # Reads
+
+    def get(self, post_id):
+        """The post as a detached object built from the cache (loading it on a miss), or None"""
+        if not self.enabled:
+            return self.db.session.get(self.model, post_id)
+        self.ensure_listener()
+
+        entry = self.entries.get(post_id)
+        if entry is not None and self._still_valid(post_id, entry):
+            self._count('hits')
+            return self._build(entry['fields'])
+
+        self._count('misses')
+        started = time.monotonic()
+        post = self.db.session.get(self.model, post_id)
+        if post is None:
+            return None
+        fields = {column: getattr(post, column) for column in self.columns}
+        if self._may_store(post_id, started):
+            self.entries.set(post_id, {'fields': fields, 'checked': time.monotonic()})
+        return post
+
+    def peek(self, post_id):
+        """The post as a detached object when it is already cached, else None (never loads it)"""
+        if not self.enabled:
+            return None
+        self.ensure_listener()
+        entry = self.entries.get(post_id)
+        if entry is None or not self._still_valid(post_id, entry):
+            return None
+        self._count('hits')
+        return self._build(entry['fields'])
+
+    def get_or_404(self, post_id):
+        post = self.get(post_id)
+        if post is None:
+            abort(404)
+        return post
+
+    def _still_valid(self, post_id, entry):
+        """With NOTIFY every entry is current; otherwise re-check updated_at once per poll interval"""
+        if self._listening or time.monotonic() - entry['checked'] < self.poll_interval:
+            return True
+        updated_at = self.db.session.execute(
+            sql_select(self.model.updated_at).where(self.model.id == post_id)).scalar()
+        if updated_at != entry['fields']['updated_at']:
+            self.entries.delete(post_id)
+            self._count('stale')
+            return False
+        entry['checked'] = time.monotonic()
+        return True
+
+    def _may_store(self, post_id, started):
+        """False when the post was invalidated while (or shortly before) it was being loaded"""
+        with self._lock:
+            invalidated = max(self._invalidated.get(post_id, 0.0), self._cleared_at)
+        return invalidated < started - self.hold_off
+
+    def _build(self, fields):
+        post = self.model.__mapper__.class_manager.new_instance()
+        for column, value in fields.items():
+            set_committed_value(post, column, value)
+        return post
+
+    # Invalidation
+
+    def invalidate(self, post_ids):
+        """Drop ``post_ids`` here and tell the other workers to drop them too"""
+        post_ids = list(post_ids)
+        if not post_ids or not self.enabled:
+            return
+        self._drop(post_ids)
+        if not self.notifies:
+            return  # the other workers' polling picks the change up
+        payload = ','.join(str(post_id) for post_id in post_ids)
+        if len(payload) > MAX_PAYLOAD:
+            payload = '*'
+        try:
+            self._notify(payload)
+        except Exception as e:
+            print(f"⚠️ Could not notify other workers of changed posts ({e}); they catch up within {self.ttl}s")
+
+    def on_page_invalidation(self, handler):
+        """Call ``handler(tags)`` in every worker for tags passed to publish_pages() ('*': all pages)"""
+        self._page_handlers.append(handler)
+
+    def publish_pages(self, tags):
+        """Tell every worker (this one included) to invalidate the page cache ``tags``; False without NOTIFY"""
+        if not self.notifies:
+            return False
+        self._notify(pages_payload(tags))
+        return True
+
+    @property
+    def notifies(self):
+        return self.db.engine.dialect.name == 'postgresql'
+
+    def _notify(self, payload):
+        with self.db.engine.connect() as connection:
+            connection.execute(sql_select(func.pg_notify(CHANNEL, payload)))
+            connection.commit()
+
+    def _drop(self, post_ids):
+        now = time.monotonic()
+        with self._lock:
+            if post_ids == '*':
+                self._cleared_at = now
+                self._invalidated.clear()
+            else:
+                for post_id in post_ids:
+                    self._invalidated[post_id] = now
+                # Forget invalidations too old to block a store
+                if len(self._invalidated) > 10000:
+                    horizon = now - self.hold_off - 60
+                    self._invalidated = {key: at for key, at in self._invalidated.items() if at > horizon}
+            self._counters['invalidations'] += 1
+        if post_ids == '*':
+            self.entries.clear()
+        else:
+            for post_id in post_ids:
+                self.entries.delete(post_id)
+
+    # LISTEN
+
+    def ensure_listener(self):
+        """Start this process's LISTEN thread (once per process: gunicorn forks after import)"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._listening = False
+        engine = self.db.engine
+        if engine.dialect.name == 'postgresql':
+            threading.Thread(target=self._listen, args=(engine,), name='post-cache-listener', daemon=True).start()
+
+    def _listen(self, engine):
+        while True:
+            connection = None
+            try:
+                # A connection of its own, taken out of the pool for good
+                connection = engine.raw_connection()
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(f'LISTEN {CHANNEL}')
+                # Anything published while nobody was listening is lost
+                self._drop('*')
+                self._drop_pages('*')
+                self._listening = True
+                while True:
+                    if select.select([dbapi_connection], [], [], 60) != ([], [], []):
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            self._handle(dbapi_connection.notifies.pop(0).payload)
+            except Exception as e:
+                self._listening = False
+                print(f"⚠️ Post cache lost its NOTIFY connection ({e}); polling until it reconnects")
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(RECONNECT_DELAY)
+
+    def _handle(self, payload):
+        self._count('notifications')
+        if payload.startswith(PAGES_PREFIX):
+            tags = payload[len(PAGES_PREFIX):]
+            try:
+                self._drop_pages('*' if tags == '*' else json.loads(tags))
+            except ValueError:
+                self._drop_pages('*')
+            return
+        if payload == '*':
+            self._drop('*')
+            return
+        post_ids = []
+        for value in payload.split(','):
+            try:
+                post_ids.append(int(value))
+            except ValueError:
+                continue
+        self._drop(post_ids)
+
+    def _drop_pages(self, tags):
+        for handler in self._page_handlers:
+            try:
+                handler(tags)
+            except Exception as e:
+                print(f"⚠️ Page cache invalidation from another worker failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['entries'] = len(self.entries)
+        stats['invalidation'] = 'notify' if self._listening else 'polling'
+        return stats
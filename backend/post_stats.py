@@ -0,0 +1,130 @@
+"""
+Incrementally maintained post statistics for Daily Post
+The post_stat table holds one row per counter: ('total', ''), ('category',
+<name>) and ('author', <name>), each with post and featured counts. Database
+triggers keep it in step with every write to post -- including raw SQL from
+the database manager -- so reading the stats never scans the post table.
+
+PostgreSQL uses statement-level triggers with transition tables, applying one
+grouped upsert per statement; SQLite uses equivalent row-level triggers.
+"""
+
+from sqlalchemy import event, text
+
+# Grouped +1/-1 deltas from a statement's transition tables, upserted in key order
+_PG_UPSERT = """
+        INSERT INTO post_stat (kind, key, post_count, featured_count)
+        SELECT CASE WHEN GROUPING(category) = 0 THEN 'category'
+                    WHEN GROUPING(author) = 0 THEN 'author'
+                    ELSE 'total' END,
+               CASE WHEN GROUPING(category) = 0 THEN category
+                    WHEN GROUPING(author) = 0 THEN author
+                    ELSE '' END,
+               SUM(sign)::integer,
+               SUM(CASE WHEN featured THEN sign ELSE 0 END)::integer
+        FROM ({delta}) AS delta
+        GROUP BY GROUPING SETS ((category), (author), ())
+        HAVING SUM(sign) <> 0 OR SUM(CASE WHEN featured THEN sign ELSE 0 END) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (kind, key) DO UPDATE
+            SET post_count = post_stat.post_count + EXCLUDED.post_count,
+                featured_count = post_stat.featured_count + EXCLUDED.featured_count;"""
+
+_PG_NEW_ROWS = "SELECT category, author, featured, 1 AS sign FROM new_rows"
+_PG_OLD_ROWS = "SELECT category, author, featured, -1 AS sign FROM old_rows"
+
+POSTGRESQL_TRIGGERS = [
+    f"""
+CREATE OR REPLACE FUNCTION post_stat_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{_PG_UPSERT.format(delta=_PG_NEW_ROWS)}
+    ELSIF TG_OP = 'DELETE' THEN{_PG_UPSERT.format(delta=_PG_OLD_ROWS)}
+    ELSE{_PG_UPSERT.format(delta=_PG_NEW_ROWS + ' UNION ALL ' + _PG_OLD_ROWS)}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS post_stat_insert ON post",
+    "DROP TRIGGER IF EXISTS post_stat_update ON post",
+    "DROP TRIGGER IF EXISTS post_stat_delete ON post",
+    """CREATE TRIGGER post_stat_insert AFTER INSERT ON post
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+    """CREATE TRIGGER post_stat_update AFTER UPDATE ON post
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+    """CREATE TRIGGER post_stat_delete AFTER DELETE ON post
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION post_stat_apply()""",
+]
+
+
+def _sqlite_upserts(row, sign):
+    """Upserts applying one OLD/NEW row to the total, category and author counters"""
+    statements = []
+    for kind, key in (('total', "''"), ('category', f'{row}.category'), ('author', f'{row}.author')):
+        statements.append(
+            f"INSERT INTO post_stat (kind, key, post_count, featured_count) "
+            f"VALUES ('{kind}', {key}, {sign}, {sign} * COALESCE({row}.featured, 0)) "
+            f"ON CONFLICT (kind, key) DO UPDATE SET "
+            f"post_count = post_count + excluded.post_count, "
+            f"featured_count = featured_count + excluded.featured_count;"
+        )
+    return '\n    '.join(statements)
+
+
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS post_stat_insert AFTER INSERT ON post
+BEGIN
+    {_sqlite_upserts('NEW', 1)}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS post_stat_update AFTER UPDATE OF category, author, featured ON post
+BEGIN
+    {_sqlite_upserts('OLD', -1)}
+    {_sqlite_upserts('NEW', 1)}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS post_stat_delete AFTER DELETE ON post
+BEGIN
+    {_sqlite_upserts('OLD', -1)}
+END""",
+]
+
+REBUILD_STATEMENTS = [
+    "DELETE FROM post_stat",
+    """INSERT INTO post_stat (kind, key, post_count, featured_count)
+    SELECT 'total', '', COUNT(*), COALESCE(SUM(CASE WHEN featured THEN 1 ELSE 0 END), 0) FROM post
+    UNION ALL
+    SELECT 'category', category, COUNT(*), SUM(CASE WHEN featured THEN 1 ELSE 0 END) FROM post GROUP BY category
+    UNION ALL
+    SELECT 'author', author, COUNT(*), SUM(CASE WHEN featured THEN 1 ELSE 0 END) FROM post GROUP BY author""",
+]
+
+
+def trigger_statements(dialect_name):
+    if dialect_name == 'postgresql':
+        return POSTGRESQL_TRIGGERS
+    if dialect_name == 'sqlite':
+        return SQLITE_TRIGGERS
+    return []
+
+
+def install_triggers(connection):
+    """(Re)create the post_stat maintenance triggers; safe to run repeatedly"""
+    for statement in trigger_statements(connection.dialect.name):
+        connection.execute(text(statement))
+
+
+def rebuild_post_stats(connection):
+    """Recompute every counter from the post table (used for backfill and repair)"""
+    for statement in REBUILD_STATEMENTS:
+        connection.execute(text(statement))
+
+
+def register_post_stats(metadata):
+    """Install the triggers whenever create_all() runs, backfilling an empty post_stat table"""
+    def after_create(target, connection, **kw):
+        install_triggers(connection)
+        if connection.execute(text("SELECT COUNT(*) FROM post_stat")).scalar() == 0:
+            rebuild_post_stats(connection)
+
+    event.listen(metadata, 'after_create', after_create)
@@ -0,0 +1,64 @@
+"""
+Post summary fields and queries for Daily Post list views
+Each post stores an ``excerpt``, ``word_count`` and ``reading_time``,
+computed once from its content whenever the content is written. Listings
+(home page, categories, search, the admin table and /api/posts) load those
+small columns plus the metadata, instead of every full article body.
+
+Summary posts are regular Post objects with ``preview`` populated and
+``content`` left unloaded; touching ``content`` on one raises instead of
+silently issuing a query per row.
+"""
+
+import math
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import load_only, with_expression
+
+SUMMARY_COLUMNS = ('id', 'title', 'author', 'date_posted', 'category', 'featured', 'image_url',
+                   'updated_at', 'word_count', 'reading_time', 'image_renditions')
+
+# Longest excerpt any list view shows; longer content is cut and ends in '...'
+EXCERPT_LENGTH = 300
+WORDS_PER_MINUTE = 200
+
+
+def make_excerpt(content):
+    content = content or ''
+    return content[:EXCERPT_LENGTH] + '...' if len(content) > EXCERPT_LENGTH else content
+
+
+def summary_fields(content):
+    """The precomputed excerpt, word_count and reading_time (minutes) for ``content``"""
+    word_count = len((content or '').split())
+    return {
+        'excerpt': make_excerpt(content),
+        'word_count': word_count,
+        'reading_time': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+def excerpt_expression(content):
+    """SQL equivalent of make_excerpt(), for rows written before excerpts were stored"""
+    return case((func.length(content) > EXCERPT_LENGTH, func.substr(content, 1, EXCERPT_LENGTH).concat('...')),
+                else_=content)
+
+
+def summary_options(model):
+    """Loader options restricting ``model`` to its summary columns plus ``preview``"""
+    return [
+        load_only(*(getattr(model, name) for name in SUMMARY_COLUMNS), raiseload=True),
+        with_expression(model.preview, func.coalesce(model.excerpt, excerpt_expression(model.content))),
+    ]
+
+
+def summarize(query, model):
+    """Apply summary loading to a Query whose entities include ``model``"""
+    # populate_existing fills in preview on posts another list query already loaded this request
+    return query.options(*summary_options(model)).execution_options(populate_existing=True)
+
+
+def preview_text(post, length):
+    """A summary post's excerpt cut to ``length`` characters, with an ellipsis if it was cut"""
+    preview = post.preview or ''
+    return preview[:length] + '...' if len(preview) > length else preview
@@ -0,0 +1,180 @@
+"""
+Read-replica routing for Daily Post
+Public read-only views can run their queries on PostgreSQL streaming
+replicas instead of the primary, so read load scales by adding replicas.
+
+* Views wrapped with ``ReplicaRouter.read_only`` pick a replica round-robin;
+  everything else (admin pages, writes, jobs, the CLI) uses the primary.
+* A replica that fails a query, cannot be reached or lags more than
+  ``max_lag`` seconds behind is skipped for ``retry_after`` seconds. A view
+  that fails on a replica is re-run on the next one, then on the primary.
+* Read-your-writes: after an admin commits a change, that admin's reads stay
+  on the primary for ``sticky_seconds``, so they never see the old version.
+
+Without replica URLs the router does nothing and every query uses the primary.
+"""
+
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_app_context, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle primary would otherwise look like growing lag)
+_PG_REPLICA_LAG = text("""
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END""")
+
+# Flask session key holding the time until which an admin's reads use the primary
+STICKY_SESSION_KEY = 'read_primary_until'
+
+
+class Replica:
+    """One replica engine and its health"""
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag = None
+
+    def __repr__(self):
+        return f'<Replica {self.name}>'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends queries to the replica chosen for the request"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = g.get('db_replica') if has_app_context() else None
+        if replica is not None and bind is None and not self._flushing:
+            return replica.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Chooses a healthy replica for read-only views; see the module docstring"""
+
+    def __init__(self, urls=(), engine_options=None, retry_after=30, max_lag=5,
+                 check_interval=5, sticky_seconds=10):
+        self.replicas = [Replica(_display_name(url), create_engine(url, **(engine_options or {})))
+                         for url in urls]
+        self.retry_after = retry_after
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self.db = None
+
+    def init_app(self, app, db):
+        """Remember admin writes so the admin's next reads use the primary"""
+        self.db = db
+        if self.replicas:
+            event.listen(db.session, 'after_commit', self._after_commit)
+        app.extensions['replica_router'] = self
+
+    def _after_commit(self, db_session):
+        if has_request_context() and 'user_id' in session and self.sticky_seconds:
+            session[STICKY_SESSION_KEY] = time.time() + self.sticky_seconds
+
+    # Health
+
+    def mark_down(self, replica, reason):
+        replica.down_until = time.monotonic() + self.retry_after
+        print(f"⚠️ Read replica {replica.name} skipped for {self.retry_after}s: {reason}")
+
+    def _healthy(self, replica, now):
+        if replica.down_until > now:
+            return False
+        if now - replica.checked_at < self.check_interval:
+            return True
+        # At most one check per interval; other requests keep using the replica meanwhile
+        with self._lock:
+            if now - replica.checked_at < self.check_interval:
+                return True
+            replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                if replica.engine.dialect.name == 'postgresql':
+                    replica.lag = float(connection.execute(_PG_REPLICA_LAG).scalar() or 0)
+                else:
+                    connection.execute(text('SELECT 1'))
+                    replica.lag = 0.0
+        except OperationalError as e:
+            self.mark_down(replica, f'health check failed ({str(e).splitlines()[0]})')
+            return False
+        if self.max_lag and replica.lag > self.max_lag:
+            self.mark_down(replica, f'{replica.lag:.1f}s behind the primary')
+            return False
+        return True
+
+    def choose(self, exclude=()):
+        """The next healthy replica, or None when the primary should serve the request"""
+        if not self.replicas or self.is_sticky():
+            return None
+        now = time.monotonic()
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica not in exclude and self._healthy(replica, now):
+                return replica
+        return None
+
+    def is_sticky(self):
+        return has_request_context() and session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+    def on_replica(self):
+        """True while the current view's queries go to a replica"""
+        return has_app_context() and g.get('db_replica') is not None
+
+    # Views
+
+    def read_only(self, view):
+        """Run the view's queries on a replica, failing over to the next one and then the primary"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            failed = []
+            while True:
+                replica = self.choose(exclude=failed)
+                g.db_replica = replica
+                try:
+                    return view(*args, **kwargs)
+                except OperationalError as e:
+                    if replica is None:
+                        raise
+                    self.db.session.rollback()
+                    self.mark_down(replica, str(e).splitlines()[0])
+                    failed.append(replica)
+                finally:
+                    g.pop('db_replica', None)
+        return wrapper
+
+    def status(self):
+        now = time.monotonic()
+        return [{
+            'name': replica.name,
+            'healthy': replica.down_until <= now,
+            'lag_seconds': replica.lag,
+            'retry_in': max(0, round(replica.down_until - now, 1)),
+        } for replica in self.replicas]
+
+    def dispose(self, close=True):
+        for replica in self.replicas:
+            replica.engine.dispose(close=close)
+
+
+def _display_name(url):
+    """host:port/database of a URL, without credentials, for logs and /admin/replicas"""
+    url = make_url(url)
+    if url.drivername.startswith('sqlite'):
+        return url.database or ':memory:'
+    return f"{url.host}:{url.port or 5432}/{url.database}"
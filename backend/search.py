@@ -0,0 +1,96 @@
+"""
+Full-text search for Daily Post
+On PostgreSQL, posts carry a generated ``search_vector`` tsvector column
+(title weighted A, author C, content B) backed by a GIN index; queries are
+matched with websearch_to_tsquery, ranked with ts_rank and returned with a
+highlighted ts_headline snippet. Other databases fall back to LIKE matching.
+"""
+
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, cast, event, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+
+from pagination import keyset_paginate
+from post_summary import summarize
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(author, '')), 'C') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')"
+)
+
+# Highlight markers are replaced with <mark> after the snippet is HTML-escaped
+_START_SEL = '⟦'
+_STOP_SEL = '⟧'
+HEADLINE_OPTIONS = f'StartSel={_START_SEL}, StopSel={_STOP_SEL}, MaxWords=45, MinWords=20, MaxFragments=2'
+
+
+def register_search_vector(table):
+    """Create the search_vector column and its GIN index when create_all() builds ``table`` on PostgreSQL"""
+    event.listen(table, 'after_create', DDL(
+        f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+    ).execute_if(dialect='postgresql'))
+    event.listen(table, 'after_create', DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_{table.name}_search_vector ON {table.name} USING GIN (search_vector)"
+    ).execute_if(dialect='postgresql'))
+
+
+def highlight(snippet):
+    """Turn a ts_headline snippet into safe HTML with <mark> around matches"""
+    if not snippet:
+        return None
+    html = str(escape(snippet)).replace(_START_SEL, '<mark>').replace(_STOP_SEL, '</mark>')
+    return Markup(html)
+
+
+def ranked_search_query(session, model, text):
+    """Build the PostgreSQL full-text query for ``text``; returns (query, rank expression).
+
+    Rows are (summary post, rank, snippet); the caller applies ordering and limits.
+    """
+    vector = literal_column(f'{model.__tablename__}.search_vector')
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    # ts_rank returns real; widen it so the value round-trips exactly through page cursors
+    rank = cast(func.ts_rank(vector, tsquery), DOUBLE_PRECISION)
+    # ts_headline is costly; PostgreSQL evaluates it only for the rows that survive LIMIT
+    snippet = func.ts_headline(SEARCH_CONFIG, model.content, tsquery, HEADLINE_OPTIONS)
+
+    query = summarize(session.query(model, rank.label('rank'), snippet.label('snippet')), model) \
+        .filter(vector.op('@@')(tsquery))
+    return query, rank
+
+
+def search_posts(session, model, text, cursor=None, per_page=5):
+    """Return a KeysetPage of posts matching ``text``, best match first.
+
+    Each returned post has ``search_rank`` and ``search_snippet`` attributes;
+    the snippet is None when the database has no full-text support.
+    Raises ValueError for a malformed cursor.
+    """
+    if session.get_bind().dialect.name != 'postgresql':
+        return _search_posts_like(model, text, cursor, per_page)
+
+    query, rank = ranked_search_query(session, model, text)
+    page = keyset_paginate(query, (rank, model.id), cursor=cursor, per_page=per_page,
+                           key=lambda row: (row.rank, row[0].id))
+
+    posts = []
+    for post, row_rank, row_snippet in page.items:
+        post.search_rank = row_rank
+        post.search_snippet = highlight(row_snippet)
+        posts.append(post)
+    page.items = posts
+    return page
+
+
+def _search_posts_like(model, text, cursor, per_page):
+    """Substring match for databases without full-text search, newest first"""
+    query = summarize(model.query, model).filter(or_(model.title.contains(text), model.content.contains(text)))
+    page = keyset_paginate(query, (model.date_posted, model.id), cursor=cursor, per_page=per_page)
+    for post in page.items:
+        post.search_rank = None
+        post.search_snippet = None
+    return page
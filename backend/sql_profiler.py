@@ -0,0 +1,243 @@
+"""
+SQL profiler for Daily Post
+Watches every statement a request runs (SQLAlchemy cursor events) and
+reports two things:
+
+* slow statements -- anything slower than ``slow_ms`` is logged with the
+  database's query plan (EXPLAIN on PostgreSQL, EXPLAIN QUERY PLAN on
+  SQLite). Bound parameters can hold passwords, emails or post drafts, so
+  they are only logged with the ``log_parameters`` setting;
+* N+1 patterns -- the same statement shape run ``repeat_threshold`` or more
+  times in one request, usually a lazy load or a query inside a loop.
+
+Findings are printed and the most recent ones are kept for
+/admin/sql-profiler. The profiler is off by default and cheap when off.
+Settings are stored in a small JSON file (in the instance folder) that every
+worker re-reads when it changes, so toggling it from the admin route takes
+effect in all workers on the host without a restart.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULTS = {
+    'enabled': False,
+    'slow_ms': 100,
+    'explain': True,
+    'repeat_threshold': 5,
+    'log_parameters': False,
+}
+
+# Placeholder lists of any length ("?, ?, ?" or "%(p_1)s, %(p_2)s") count as one shape
+_PLACEHOLDER_LIST = re.compile(r'(\?|%\(\w+\)s|%s|:\w+)(\s*,\s*(\?|%\(\w+\)s|%s|:\w+))+')
+_WHITESPACE = re.compile(r'\s+')
+
+# How often (seconds) a worker checks the settings file for changes
+SETTINGS_CHECK_INTERVAL = 1.0
+
+
+def statement_shape(statement):
+    """Normalise a statement so executions differing only in parameters compare equal"""
+    return _PLACEHOLDER_LIST.sub(r'\1, ...', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _coerce(default, value):
+    """Convert a setting from JSON or a form to the type of its default"""
+    if isinstance(default, bool):
+        return value.lower() in ('1', 'true', 'on', 'yes') if isinstance(value, str) else bool(value)
+    return type(default)(value)
+
+
+def _truncate(value, length=500):
+    text = repr(value)
+    return text if len(text) <= length else text[:length] + '...'
+
+
+class SQLProfiler:
+    """Slow-query log and per-request N+1 detector, attached to a Flask app"""
+
+    def __init__(self, settings_path=None, history=50):
+        self.settings_path = settings_path
+        self.settings = dict(DEFAULTS)
+        self.findings = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._settings_mtime = None
+        self._settings_checked = 0.0
+
+    def init_app(self, app, **defaults):
+        """Install the request hooks and engine listeners; ``defaults`` override DEFAULTS"""
+        self.settings.update(defaults)
+        if self.settings_path is None:
+            self.settings_path = os.path.join(app.instance_path, 'sql_profiler.json')
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(Engine, 'handle_error', self._handle_error)
+
+    # Settings
+
+    def configure(self, **changes):
+        """Change settings for every worker: saved to the settings file, applied here immediately"""
+        unknown = set(changes) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown profiler setting(s): {', '.join(sorted(unknown))}")
+        changes = {key: _coerce(DEFAULTS[key], value) for key, value in changes.items()}
+        with self._lock:
+            self.settings.update(changes)
+            settings = dict(self.settings)
+        try:
+            os.makedirs(os.path.dirname(self.settings_path), exist_ok=True)
+            temporary = f'{self.settings_path}.{os.getpid()}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(settings, f)
+            os.replace(temporary, self.settings_path)
+        except OSError as e:
+            # Read-only filesystems (serverless): the change applies to this process only
+            print(f"⚠️ Could not save SQL profiler settings ({e}); applied to this process only")
+        return settings
+
+    def _refresh_settings(self):
+        now = time.monotonic()
+        if now - self._settings_checked < SETTINGS_CHECK_INTERVAL:
+            return
+        self._settings_checked = now
+        try:
+            mtime = os.stat(self.settings_path).st_mtime
+            if mtime == self._settings_mtime:
+                return
+            with open(self.settings_path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._settings_mtime = mtime
+            self.settings.update({key: value for key, value in saved.items() if key in DEFAULTS})
+
+    # Request hooks
+
+    def _before_request(self):
+        self._refresh_settings()
+        if self.settings['enabled']:
+            g.sql_profile = {'shapes': Counter(), 'statements': 0}
+
+    def _teardown_request(self, exc):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return
+        threshold = self.settings['repeat_threshold']
+        for shape, count in profile['shapes'].most_common():
+            if count < threshold:
+                break
+            self._record({
+                'kind': 'n_plus_one',
+                'endpoint': request.endpoint,
+                'path': self._path(),
+                'count': count,
+                'statements': profile['statements'],
+                'statement': shape,
+            })
+            print(f"🔁 N+1 suspected in {request.endpoint}: the same statement ran {count} times "
+                  f"({profile['statements']} in total): {shape[:200]}")
+
+    def _path(self):
+        # Query strings carry user input too (searches, tokens); they follow log_parameters
+        return request.full_path.rstrip('?') if self.settings['log_parameters'] else request.path
+
+    # SQLAlchemy events
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('sql_profile') is not None and not conn.info.get('sql_profiler_explaining'):
+            conn.info.setdefault('sql_profiler_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('sql_profiler_started')
+        if not started or conn.info.get('sql_profiler_explaining'):
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        profile = g.get('sql_profile') if has_request_context() else None
+        if profile is None:
+            return
+
+        profile['statements'] += 1
+        profile['shapes'][statement_shape(statement)] += 1
+        if elapsed_ms >= self.settings['slow_ms']:
+            plan = self._explain(conn, statement, parameters) \
+                if self.settings['explain'] and not executemany else None
+            finding = {
+                'kind': 'slow',
+                'endpoint': request.endpoint,
+                'path': self._path(),
+                'ms': round(elapsed_ms, 1),
+                'statement': statement,
+                'plan': plan,
+            }
+            if self.settings['log_parameters']:
+                finding['parameters'] = _truncate(parameters)
+            self._record(finding)
+            print(f"🐢 Slow query ({elapsed_ms:.0f} ms) in {request.endpoint}: {_WHITESPACE.sub(' ', statement)[:300]}")
+            if 'parameters' in finding:
+                print(f"    parameters: {finding['parameters']}")
+            for line in plan or []:
+                print(f"    {line}")
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        started = exception_context.connection.info.get('sql_profiler_started') \
+            if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+    def _explain(self, conn, statement, parameters):
+        """The plan for ``statement``, run on its own cursor so the original results stay unread"""
+        dialect = conn.dialect.name
+        if dialect == 'postgresql':
+            prefix = 'EXPLAIN '
+        elif dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            return None
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')):
+            return None
+
+        dbapi_connection = conn.connection.dbapi_connection
+        conn.info['sql_profiler_explaining'] = True
+        cursor = dbapi_connection.cursor()
+        try:
+            if dialect == 'postgresql':
+                # A failing EXPLAIN must not abort the request's transaction
+                cursor.execute('SAVEPOINT sql_profiler_explain')
+            try:
+                if parameters:
+                    cursor.execute(prefix + statement, parameters)
+                else:
+                    cursor.execute(prefix + statement)
+                rows = cursor.fetchall()
+            except Exception as e:
+                if dialect == 'postgresql':
+                    cursor.execute('ROLLBACK TO SAVEPOINT sql_profiler_explain')
+                return [f'EXPLAIN failed: {e}']
+            if dialect == 'postgresql':
+                cursor.execute('RELEASE SAVEPOINT sql_profiler_explain')
+            return [' | '.join(str(column) for column in row) for row in rows]
+        finally:
+            cursor.close()
+            conn.info['sql_profiler_explaining'] = False
+
+    def _record(self, finding):
+        finding['at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self._lock:
+            self.findings.appendleft(finding)
+
+    def report(self):
+        with self._lock:
+            return {'settings': dict(self.settings), 'findings': list(self.findings)}
@@ -71,26 +71,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    // Reading time calculator
-    const postContent = document.querySelector('.post-content');
-    if (postContent) {
-        const text = postContent.textContent || postContent.innerText;
-        const wordsPerMinute = 200;
-        const wordCount = text.trim().split(/\s+/).length;
-        const readingTime = Math.ceil(wordCount / wordsPerMinute);
-        
-        // Add reading time indicator
-        const readingTimeEl = document.createElement('small');
-        readingTimeEl.className = 'text-muted';
-        readingTimeEl.innerHTML = `<i class="fas fa-clock me-1"></i>${readingTime} min read`;
-        
-        const postHeader = document.querySelector('.card-body .d-flex.align-items-center.text-muted');
-        if (postHeader) {
-            postHeader.appendChild(document.createElement('span')).className = 'me-3';
-            postHeader.appendChild(readingTimeEl);
-        }
-    }
-
     // Back to top button
     const backToTopBtn = document.createElement('button');
     backToTopBtn.innerHTML = '<i class="fas fa-arrow-up"></i>';